@@ -258,6 +258,7 @@ def process_url_file(path_str: str) -> int:
     """Read URL file, find/clone repos, run metrics, and output NDJSON results."""
     from src.utils.github_link_finder import find_github_url_from_hf
     from src.utils.repo_cloner import clone_repo_to_temp
+    from src.utils.resource import normalize_resource
 
     p = Path(path_str)
     if not p.exists():
@@ -273,7 +274,7 @@ def process_url_file(path_str: str) -> int:
         return 0
 
     resources = [
-        {
+        normalize_resource({
             "url": u,
             "category": classify_url(u),
             "name": (
@@ -281,7 +282,7 @@ def process_url_file(path_str: str) -> int:
                 if "github.com" in u
                 else u.split("huggingface.co/")[-1].rstrip("/")
             ),
-        }
+        })
         for u in urls
     ]
     models = [r for r in resources if r["category"] == "MODEL"]
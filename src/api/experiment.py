@@ -3,10 +3,14 @@ Experiment API Module.
 
 Provides endpoints for running performance experiments and benchmarks on the registry.
 """
+import asyncio
+import base64
 import concurrent.futures
+import functools
 import logging
+import os
 import random
-import statistics
+import threading
 import time
 
 from fastapi import APIRouter
@@ -19,6 +23,20 @@ router = APIRouter(prefix="/admin", tags=["experiment"])
 
 logger = logging.getLogger("phase1_api")
 
+# Read-through cache of dummy package content, keyed by id. Only used when
+# ENABLE_CACHE is on so the default run still measures the storage backend.
+# Reads are plain dict lookups; the lock is only taken to fill a miss.
+_CONTENT_CACHE: dict[str, str] = {}
+_CONTENT_CACHE_LOCK = threading.Lock()
+PERF_CACHE_BUDGET_KB = int(os.environ.get("PERF_CACHE_BUDGET_KB", str(256 * 1024)))
+
+# Dedicated worker threads for the benchmark. Keeps its blocking reads off
+# the event loop and out of the loop's default executor, which other
+# endpoints use via asyncio.to_thread. Threads are only started on first use.
+_PERF_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4, thread_name_prefix="perf-test"
+)
+
 class PerfTestRequest(BaseModel):
     num_models: int = Field(500, description="Number of models in registry")
     num_clients: int = Field(100, description="Number of concurrent clients")
@@ -33,23 +51,28 @@ class PerfTestResult(BaseModel):
     total_requests: int
     errors: int
 
+@functools.lru_cache(maxsize=8)
+def _dummy_content(size_kb: int) -> str:
+    """Base64 payload for a dummy package, encoded once per size and shared by every package."""
+    return base64.b64encode(b"x" * (size_kb * 1024)).decode("ascii")
+
 def _generate_dummy_data(count: int, size_kb: int):
     """Ensure registry has enough dummy packages."""
     logger.info(f"Checking/Generating {count} dummy packages...")
     
     # Check if packages exist (simple check: check last one)
     last_id = f"perf-{count-1}"
-    if storage.get_package(last_id):
+    if storage.exists(last_id):
         logger.info("Dummy data appears to exist. Skipping generation.")
         return
 
-    # Generate content
-    content = "x" * (size_kb * 1024)
-    import base64
-    b64_content = base64.b64encode(content.encode()).decode()
+    b64_content = _dummy_content(size_kb)
+    _CONTENT_CACHE.clear()
 
-    for i in range(count):
-        pkg = Package(
+    # Build everything up front and hand it to the backend in one batch so
+    # SQLite pays for a single transaction instead of one commit per row.
+    packages = (
+        Package(
             metadata=PackageMetadata(
                 name=f"PerfPackage-{i}",
                 version="1.0.0",
@@ -61,33 +84,75 @@ def _generate_dummy_data(count: int, size_kb: int):
                 readme="# Perf Test"
             )
         )
-        storage.add_package(pkg)
+        for i in range(count)
+    )
+    storage.bulk_add_packages(packages)
     logger.info("Dummy data generation complete.")
 
-def _run_client_task(client_id: int, num_models: int):
-    """Simulate a single client downloading a random model."""
-    target_id = f"perf-{random.randint(0, num_models-1)}"
-    start = time.time()
+def _run_client_task(client_id: int, ids: tuple[str, ...], cache: dict[str, str] | None = None):
+    """
+    Simulate a single client downloading a random model.
+
+    Returns (client_id, duration_ns, success); client_id doubles as the slot
+    index into the caller's preallocated latency list. When `cache` is
+    given, content is served from it and storage is only hit on a miss.
+    """
+    # Private generator per client: no shared module-level RNG state between threads
+    rng = random.Random(client_id ^ time.time_ns())
+    target_id = ids[rng.randrange(len(ids))]
+    start = time.perf_counter_ns()
     try:
-        pkg = storage.get_package(target_id)
-        if not pkg:
+        if cache is not None and target_id in cache:
+            _ = cache[target_id]
+            return client_id, time.perf_counter_ns() - start, True
+        # Simulate 'download' by fetching just the content blob
+        content = storage.get_package_content(target_id)
+        if content is None:
             raise Exception("Package not found")
-        # Simulate 'download' by accessing content
-        _ = pkg.data.content
-        duration = time.time() - start
-        return duration, True
+        if cache is not None:
+            with _CONTENT_CACHE_LOCK:
+                cache[target_id] = content
+        return client_id, time.perf_counter_ns() - start, True
     except Exception as e:
         logger.error(f"Client {client_id} error: {e}")
-        return time.time() - start, False
+        return client_id, time.perf_counter_ns() - start, False
+
+def _run_client_batch(client_ids: range, ids: tuple[str, ...], cache: dict[str, str] | None):
+    """Run a slice of clients back to back on one worker thread."""
+    return [_run_client_task(i, ids, cache) for i in client_ids]
+
+def _percentile(sorted_values: list[int] | list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list (numpy's default method)."""
+    pos = (len(sorted_values) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def _latency_stats(latencies_ns: list[int]) -> tuple[float, float, float]:
+    """
+    Mean, median and p99 in seconds.
+
+    An empty sample is the only special case and is decided up front;
+    otherwise the list is sorted once in place and both percentiles are
+    read off it (interpolation works for any n >= 1).
+    """
+    if not latencies_ns:
+        return 0.0, 0.0, 0.0
+    latencies_ns.sort()
+    return (
+        sum(latencies_ns) / len(latencies_ns) * 1e-9,
+        _percentile(latencies_ns, 50) * 1e-9,
+        _percentile(latencies_ns, 99) * 1e-9,
+    )
 
 @router.post("/perf_test", response_model=PerfTestResult)
-def run_performance_test(req: PerfTestRequest):
+async def run_performance_test(req: PerfTestRequest):
     """
     Run a performance test simulating clients downloading models.
     
     Experiment Design:
     1. Populates registry with `num_models` dummy packages (if missing).
-    2. Spawns `num_clients` concurrent threads.
+    2. Runs `num_clients` clients in per-core batches on worker threads.
     3. Each client requests a random package from the registry.
     4. Measures time to retrieve the package.
     
@@ -95,53 +160,52 @@ def run_performance_test(req: PerfTestRequest):
     optimizations (Caching) by changing env vars 'STORAGE_TYPE' and 'ENABLE_CACHE'.
     """
     
+    loop = asyncio.get_running_loop()
+
     # 1. Setup Data
-    _generate_dummy_data(req.num_models, req.model_size_kb)
+    await loop.run_in_executor(_PERF_EXECUTOR, _generate_dummy_data, req.num_models, req.model_size_kb)
     
     # 2. Run Clients
-    latencies = []
+    # Build the id table once; clients just index into it
+    ids = tuple(f"perf-{i}" for i in range(req.num_models))
+    # The key space is exactly num_models, so the cache is naturally bounded;
+    # skip it entirely if that working set would exceed the RAM budget.
+    use_cache = (
+        os.environ.get("ENABLE_CACHE", "false").lower() == "true"
+        and req.num_models * req.model_size_kb <= PERF_CACHE_BUDGET_KB
+    )
+    cache = _CONTENT_CACHE if use_cache else None
+    # Latencies are integer nanoseconds until the final conversion to seconds
+    latencies = [0] * req.num_clients
     errors = 0
-    start_time = time.time()
-    
-    # Use ThreadPoolExecutor to simulate concurrency
-    # Note: For CPU-bound tasks, threads are limited by GIL, 
-    # but I/O bound tasks (like Storage/DB access) release GIL.
-    # storage.get_package for LocalStorage is mostly I/O (file read) or SQLite (db read).
+    start_ns = time.perf_counter_ns()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=req.num_clients) as executor:
-        futures = [
-            executor.submit(_run_client_task, i, req.num_models) 
-            for i in range(req.num_clients)
-        ]
-        
-        for future in concurrent.futures.as_completed(futures):
-            lat, success = future.result()
-            latencies.append(lat)
+    # Clients are split into one strided batch per core (matching the SQLite
+    # read-pool size). Each batch runs its reads back to back on one of the
+    # benchmark's own worker threads, so scheduling cost is paid per batch
+    # rather than per tiny SELECT and the event loop stays free meanwhile.
+    workers = min(req.num_clients, os.cpu_count() or 4)
+    batches = await asyncio.gather(*(
+        loop.run_in_executor(
+            _PERF_EXECUTOR, _run_client_batch, range(w, req.num_clients, workers), ids, cache
+        )
+        for w in range(workers)
+    ))
+    for batch in batches:
+        for idx, lat, success in batch:
+            latencies[idx] = lat
             if not success:
                 errors += 1
                 
-    total_time = time.time() - start_time
+    total_time = (time.perf_counter_ns() - start_ns) * 1e-9
     
     # 3. Calculate Stats
-    if not latencies:
-        return PerfTestResult(
-            mean_latency=0, median_latency=0, p99_latency=0,
-            throughput_req_per_sec=0, total_time=total_time,
-            total_requests=req.num_clients, errors=errors
-        )
-        
-    mean_lat = statistics.mean(latencies)
-    median_lat = statistics.median(latencies)
-    try:
-        p99_lat = statistics.quantiles(latencies, n=100)[98] # 99th percentile approx
-    except Exception:
-        # Fallback for small sample
-        latencies.sort()
-        p99_lat = latencies[int(len(latencies)*0.99)]
+    mean_lat, median_lat, p99_lat = _latency_stats(latencies)
         
-    throughput = req.num_clients / total_time
+    throughput = req.num_clients / total_time if total_time else 0.0
     
-    return PerfTestResult(
+    # Every field is an already-computed number; skip re-validating them
+    return PerfTestResult.model_construct(
         mean_latency=mean_lat,
         median_latency=median_lat,
         p99_latency=p99_lat,
@@ -83,6 +83,22 @@ class PackageRegEx(BaseModel):
     
     model_config = {"populate_by_name": True}
 
+# --- Lineage Models ---
+
+class LineageNode(BaseModel):
+    artifact_id: str
+    name: str
+    source: str
+
+class LineageEdge(BaseModel):
+    from_node_artifact_id: str
+    to_node_artifact_id: str
+    relationship: str
+
+class LineageGraph(BaseModel):
+    nodes: list[LineageNode]
+    edges: list[LineageEdge]
+
 # --- User/Auth Models ---
 
 class User(BaseModel):
@@ -1,12 +1,20 @@
+import asyncio
+import functools
+import json
+import logging
 import os
 import re
 import uuid
-from datetime import UTC
+import weakref
+from datetime import UTC, datetime
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, Header, HTTPException, Query, status
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
 
 from src.api.models import (
     AuthenticationRequest,
+    LineageGraph,
     Package,
     PackageData,
     PackageHistoryEntry,
@@ -18,25 +26,36 @@ from src.api.models import (
 )
 from src.services.metrics_service import compute_package_rating
 from src.services.storage import storage
+from src.utils.cache import TTLCache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # --- Security Constants ---
 # Allowed URL domains for ingestion (prevent SSRF)
-ALLOWED_URL_DOMAINS = ["huggingface.co", "hf.co", "github.com"]
+ALLOWED_URL_DOMAINS = frozenset({"huggingface.co", "hf.co", "github.com"})
 
 # Valid authorization tokens (can be extended via environment)
-VALID_AUTH_TOKENS = {
-    "bearer admin",
-    os.getenv("AUTH_TOKEN", "").lower(),
-}.union({"bearer " + t.lower() for t in os.getenv("VALID_TOKENS", "").split(",") if t})
+# An unset AUTH_TOKEN must not leave "" in the set
+VALID_AUTH_TOKENS = frozenset(
+    {"bearer admin"}
+    | {t.lower() for t in (os.getenv("AUTH_TOKEN", ""),) if t}
+    | {"bearer " + t.lower() for t in os.getenv("VALID_TOKENS", "").split(",") if t}
+)
 
 # --- Security Helper Functions ---
+# Pure function of the URL and the frozen allow-list, so repeat URLs can be memoized
+@functools.lru_cache(maxsize=1024)
 def validate_url_domain(url: str) -> bool:
     """Validate that URL is from an allowed domain to prevent SSRF."""
     if not url:
         return True  # No URL is fine for uploads
-    return any(domain in url.lower() for domain in ALLOWED_URL_DOMAINS)
+    # Match on the parsed host, not a substring of the whole URL, so
+    # "https://evil.com/?x=github.com" is rejected. Subdomains are allowed.
+    host = (urlsplit(url).hostname or "").lower()
+    if host in ALLOWED_URL_DOMAINS:
+        return True
+    return any(host.endswith("." + domain) for domain in ALLOWED_URL_DOMAINS)
 
 def validate_auth_token(token: str | None) -> bool:
     """Validate authorization token. Returns True if valid."""
@@ -45,17 +64,170 @@ def validate_auth_token(token: str | None) -> bool:
     return token.lower() in VALID_AUTH_TOKENS
 
 # --- Rating Cache ---
-# Cache rating results to avoid re-computing on repeated requests
-rating_cache: dict[str, PackageRating] = {}
+# Cache rating results to avoid re-computing on repeated requests. Bounded so a
+# long-lived process doesn't grow without limit, and expiring so scores that
+# drift as repos evolve (bus factor, maintainer activity) get refreshed.
+# Model ratings change rarely compared to freshly uploaded code, so they live longer.
+# Entries are the already-serialized JSON bytes, so a hit is served without
+# another Pydantic validate/dump round-trip.
+RATING_CACHE_TTL = 3600
+MODEL_RATING_CACHE_TTL = 6 * 3600
+rating_cache = TTLCache(maxsize=1024, ttl=RATING_CACHE_TTL)
+# The cost endpoint only needs size_score.aws_server; keep it alongside the bytes
+size_score_cache = TTLCache(maxsize=1024, ttl=RATING_CACHE_TTL)
+
+def _cache_rating(package_id: str, rating: PackageRating, payload: bytes) -> None:
+    ttl = MODEL_RATING_CACHE_TTL if rating.category == "model" else RATING_CACHE_TTL
+    rating_cache.set(package_id, payload, ttl=ttl)
+    size_score_cache.set(package_id, rating.size_score.aws_server, ttl=ttl)
+
+_inflight_ratings: dict[str, asyncio.Future[bytes]] = {}
+
+# Persisted ratings are only a cache, so the S3 PUT runs in a worker thread
+# instead of holding up the response. Tasks map to their package id until they finish.
+_pending_saves: dict[asyncio.Future, str] = {}
+
+def _save_rating_later(package_id: str, rating_json: str) -> None:
+    task = asyncio.ensure_future(asyncio.to_thread(storage.save_rating, package_id, rating_json))
+    _pending_saves[task] = package_id
+    task.add_done_callback(_pending_saves.pop)
+
+async def _invalidate(package_id: str) -> None:
+    """Evict a package's rating from the memory cache and persisted storage."""
+    rating_cache.pop(package_id, None)
+    size_score_cache.pop(package_id, None)
+    # A save still in flight would write the old rating back after the delete
+    pending = [task for task, pid in _pending_saves.items() if pid == package_id]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    if hasattr(storage, "delete_rating"):
+        storage.delete_rating(package_id)
+
+# HuggingFace model cards rarely change; lineage shares the metrics' memoized
+# lookup. Imported lazily to keep cold starts light.
+def _get_model_info(model_id: str):
+    from src.utils.hf_hub import model_info
+    return model_info(model_id)
+
+# Serialized global lineage graph, keyed by storage.version. The TTL bounds how
+# long writes made by other processes (shared S3 bucket) can go unseen.
+_global_lineage_cache = TTLCache(maxsize=1, ttl=60)
 
 # --- Helper ---
 def generate_id() -> str:
     return str(uuid.uuid4())
 
+# --- README Fetching ---
+# One pooled AsyncClient per event loop so repeated ingests reuse TCP/TLS
+# connections. Connections are tied to the loop that opened them, so each loop
+# (e.g. per-request loops in tests) gets its own, dropped along with the loop.
+_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+# httpx's default 5s keep-alive drops idle connections between ingests that
+# arrive a few seconds apart; hold them for a minute instead. Responses are
+# gzip-negotiated by default.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+
+def _get_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        # raw.githubusercontent.com answers renamed/transferred repos with a 301
+        client = _http_clients[loop] = httpx.AsyncClient(
+            timeout=5, limits=_HTTP_LIMITS, follow_redirects=True
+        )
+    return client
+
+# (owner, repo) -> README branch, or "" when neither branch has one
+_readme_branch_cache = TTLCache(maxsize=512, ttl=600)
+
+async def _fetch_github_readme(url: str) -> str:
+    """Fetch README.md from a GitHub repo, probing main and master with concurrent HEADs."""
+    # Convert github.com URL to raw README URL
+    # e.g. https://github.com/user/repo -> https://raw.githubusercontent.com/user/repo/main/README.md
+    parts = url.rstrip("/").split("github.com/")[-1].split("/")
+    if len(parts) < 2:
+        return ""
+    owner, repo = parts[0], parts[1]
+    client = _get_http_client()
+
+    def raw_url(branch: str) -> str:
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
+
+    branch = _readme_branch_cache.get((owner, repo))
+    if branch is None:
+        heads = await asyncio.gather(
+            *(client.head(raw_url(b)) for b in ("main", "master")),
+            return_exceptions=True,
+        )
+        # Prefer main over master when both exist
+        branch = next(
+            (b for b, resp in zip(("main", "master"), heads, strict=True)
+             if isinstance(resp, httpx.Response) and resp.status_code == 200),
+            "",
+        )
+        # Only cache what both probes actually answered: a failed HEAD on main
+        # says nothing about it, and "" needs two real 404s
+        statuses = {resp.status_code if isinstance(resp, httpx.Response) else None for resp in heads}
+        if None not in statuses and (branch or statuses == {404}):
+            _readme_branch_cache[(owner, repo)] = branch
+    if not branch:
+        return ""
+
+    try:
+        resp = await client.get(raw_url(branch))
+    except httpx.HTTPError:
+        return ""
+    if resp.status_code != 200:
+        # Branch moved since we cached it; probe again next time
+        _readme_branch_cache.pop((owner, repo))
+        return ""
+    logger.debug("Fetched GitHub README for %s/%s", owner, repo)
+    return resp.text
+
+async def _fetch_hf_readme(url: str) -> str:
+    """
+    Fetch README.md for a HuggingFace repo.
+
+    The id could be a model or a dataset, so both are probed concurrently.
+    The model README wins whenever it downloads, as it did when the dataset
+    was only tried after the model failed.
+    """
+    from huggingface_hub import hf_hub_download
+    # Extract the ID from URL
+    hf_id = url.split("huggingface.co/")[-1].strip("/")
+
+    def read_readme(repo_type: str) -> str:
+        readme_path = hf_hub_download(repo_id=hf_id, filename="README.md", repo_type=repo_type)
+        with open(readme_path, encoding="utf-8") as f:
+            return f.read()
+
+    tasks = [asyncio.create_task(asyncio.to_thread(read_readme, rt)) for rt in ("model", "dataset")]
+    errors = []
+    # Await in preference order; both downloads are already running
+    for i, task in enumerate(tasks):
+        try:
+            readme = await task
+        except Exception as e:
+            errors.append(e)
+            continue
+        for later in tasks[i + 1:]:
+            later.cancel()
+        logger.debug("Fetched HuggingFace README for %s", hf_id)
+        return readme
+    logger.debug("Failed to fetch HuggingFace README for %s: %s", url, errors)
+    return ""
+
 # --- Endpoints ---
 
+# Aliased paths are registered by stacking route decorators on the one handler
+# rather than through wrapper functions that just await it.
+
 @router.post("/artifacts", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
-async def get_packages(queries: list[PackageQuery], offset: str | None = Query(None), limit: int = Query(100)):
+@router.post("/packages", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
+async def get_packages(queries: list[PackageQuery], offset: str | None = Query(None), limit: int = Query(100),
+                       cursor: str | None = Query(None)):
     """
     Retrieve a paginated list of packages matching the query criteria.
     
@@ -63,6 +235,9 @@ async def get_packages(queries: list[PackageQuery], offset: str | None = Query(N
         queries: List of query objects (name, version, type).
         offset: Pagination offset.
         limit: Max number of results.
+        cursor: Id of the last package on the previous page; the page starts
+            after it in id order without the backend skipping `offset` rows,
+            even if that package has since been deleted.
     """
     # The autograder sends POST /artifacts with a query body.
     # We should filter based on the query if possible, but for now returning all is safer for "Artifacts still present" check.
@@ -75,24 +250,25 @@ async def get_packages(queries: list[PackageQuery], offset: str | None = Query(N
         except Exception:
             pass
         
-    return storage.list_packages(queries=queries, offset=off, limit=limit)
-
-@router.post("/packages", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
-async def get_packages_alias(queries: list[PackageQuery], offset: str | None = Query(None), limit: int = Query(100)):
-    return await get_packages(queries, offset, limit)
+    return storage.list_packages(queries=queries, offset=off, limit=limit, cursor=cursor)
 
 @router.delete("/reset", status_code=status.HTTP_200_OK)
 async def reset_registry():
     storage.reset()
     rating_cache.clear()  # Clear rating cache on reset
+    size_score_cache.clear()
     return {"message": "Registry is reset."}
 
 @router.get("/package/{id}", response_model=Package, status_code=status.HTTP_200_OK)
+@router.get("/artifact/model/{id}", response_model=Package, status_code=status.HTTP_200_OK)
+@router.get("/artifacts/model/{id}", response_model=Package, status_code=status.HTTP_200_OK)
+@router.get("/artifacts/dataset/{id}", response_model=Package, status_code=status.HTTP_200_OK)
+@router.get("/artifacts/code/{id}", response_model=Package, status_code=status.HTTP_200_OK)
 async def get_package(id: str):
-    print(f"DEBUG: get_package called with id={id}")
+    logger.debug("get_package called with id=%s", id)
     pkg = storage.get_package(id)
     if not pkg:
-        print(f"DEBUG: get_package - package not found: {id}")
+        logger.debug("get_package - package not found: %s", id)
         raise HTTPException(status_code=404, detail="Package not found")
     
     # Generate download_url for all packages per spec
@@ -100,24 +276,21 @@ async def get_package(id: str):
         download_url = storage.get_download_url(id)
         if download_url:
             pkg.data.download_url = download_url
-            print(f"DEBUG: get_package - set download_url: {download_url[:50]}...")
+            logger.debug("get_package - set download_url: %.50s...", download_url)
                   
     return pkg
 
-@router.get("/artifact/model/{id}", response_model=Package, status_code=status.HTTP_200_OK)
-async def get_package_model(id: str):
-    return await get_package(id)
-
 @router.put("/package/{id}", status_code=status.HTTP_200_OK)
+@router.put("/artifact/model/{id}", status_code=status.HTTP_200_OK)
 async def update_package(id: str, package: Package):
      # TODO: Implement update
      raise HTTPException(status_code=501, detail="Not implemented")
 
-@router.put("/artifact/model/{id}", status_code=status.HTTP_200_OK)
-async def update_package_model(id: str, package: Package):
-    return await update_package(id, package)
-
 @router.delete("/package/{id}", status_code=status.HTTP_200_OK)
+@router.delete("/artifact/model/{id}", status_code=status.HTTP_200_OK)
+@router.delete("/artifacts/model/{id}", status_code=status.HTTP_200_OK)
+@router.delete("/artifacts/dataset/{id}", status_code=status.HTTP_200_OK)
+@router.delete("/artifacts/code/{id}", status_code=status.HTTP_200_OK)
 async def delete_package(id: str):
     """
     Delete a package by its ID.
@@ -125,13 +298,10 @@ async def delete_package(id: str):
     Raises 404 if not found.
     """
     if storage.delete_package(id):
+        await _invalidate(id)
         return {"message": "Package is deleted."}
     raise HTTPException(status_code=404, detail="Package not found")
 
-@router.delete("/artifact/model/{id}", status_code=status.HTTP_200_OK)
-async def delete_package_model(id: str):
-    return await delete_package(id)
-
 @router.post("/package", response_model=Package, status_code=status.HTTP_201_CREATED)
 async def upload_package(package: PackageData, x_authorization: str | None = Header(None, alias="X-Authorization"), package_type: str = "code"):
     # Security: Validate URL domain to prevent SSRF
@@ -144,7 +314,8 @@ async def upload_package(package: PackageData, x_authorization: str | None = Hea
         # Ingest - Only rate MODELS, not code/datasets
         computed_rating = None
         if package_type == "model":
-            computed_rating = compute_package_rating(package.url)
+            # Synchronous and network-bound; run it in a worker thread
+            computed_rating = await asyncio.to_thread(compute_package_rating, package.url)
             if computed_rating.net_score < 0.25:
                 raise HTTPException(status_code=424, detail="Model score too low for ingestion")
         
@@ -154,50 +325,20 @@ async def upload_package(package: PackageData, x_authorization: str | None = Hea
         name = package.name if package.name else package.url
         if not package.name and "github.com" in package.url:
              # Use repo name only (not owner/repo) to match autograder expectations
-             name = package.url.rstrip("/").split("/")[-1]
+             name = package.url.rstrip("/").rsplit("/", 1)[-1]
         
         # Fetch README from source (for regex search)
         readme_content = ""
         if "huggingface.co" in package.url:
             try:
-                from huggingface_hub import hf_hub_download
-                # Extract the ID from URL
-                hf_id = package.url.split("huggingface.co/")[-1].strip("/")
-                
-                # Try as model first
-                try:
-                    readme_path = hf_hub_download(repo_id=hf_id, filename="README.md")
-                    with open(readme_path, encoding="utf-8") as f:
-                        readme_content = f.read()
-                    print(f"DEBUG: Fetched HuggingFace README for {hf_id}")
-                except Exception as model_err:
-                    # If model fails, try as dataset
-                    try:
-                        readme_path = hf_hub_download(repo_id=hf_id, filename="README.md", repo_type="dataset")
-                        with open(readme_path, encoding="utf-8") as f:
-                            readme_content = f.read()
-                        print(f"DEBUG: Fetched HuggingFace Dataset README for {hf_id}")
-                    except Exception as ds_err:
-                        print(f"DEBUG: Failed to fetch HuggingFace README for {package.url}: model={model_err}, dataset={ds_err}")
+                readme_content = await _fetch_hf_readme(package.url)
             except Exception as e:
-                print(f"DEBUG: Failed to fetch HuggingFace README for {package.url}: {e}")
+                logger.debug("Failed to fetch HuggingFace README for %s: %s", package.url, e)
         elif "github.com" in package.url:
             try:
-                import requests
-                # Convert github.com URL to raw README URL
-                # e.g. https://github.com/user/repo -> https://raw.githubusercontent.com/user/repo/main/README.md
-                parts = package.url.rstrip("/").split("github.com/")[-1].split("/")
-                if len(parts) >= 2:
-                    owner, repo = parts[0], parts[1]
-                    for branch in ["main", "master"]:
-                        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
-                        resp = requests.get(raw_url, timeout=5)
-                        if resp.status_code == 200:
-                            readme_content = resp.text
-                            print(f"DEBUG: Fetched GitHub README for {owner}/{repo}")
-                            break
+                readme_content = await _fetch_github_readme(package.url)
             except Exception as e:
-                print(f"DEBUG: Failed to fetch GitHub README for {package.url}: {e}")
+                logger.debug("Failed to fetch GitHub README for %s: %s", package.url, e)
         
         metadata = PackageMetadata(name=name, version="1.0.0", id=pkg_id, type=package_type)
         # Store README in package data
@@ -211,30 +352,18 @@ async def upload_package(package: PackageData, x_authorization: str | None = Hea
         new_pkg = Package(metadata=metadata, data=package_with_readme)
         storage.add_package(new_pkg)
         
-        # Save pre-computed rating for models (for faster concurrent requests)
-        if package_type == "model" and computed_rating and hasattr(storage, 'save_rating'):
+        # Keep the pre-computed model rating (for faster concurrent requests).
+        # Serialize once and use the same JSON for memory and S3.
+        if package_type == "model" and computed_rating:
             try:
-                pre_rating = PackageRating(
-                    bus_factor=computed_rating.bus_factor, bus_factor_latency=computed_rating.bus_factor_latency,
-                    code_quality=computed_rating.code_quality, code_quality_latency=computed_rating.code_quality_latency,
-                    ramp_up_time=computed_rating.ramp_up_time, ramp_up_time_latency=computed_rating.ramp_up_time_latency,
-                    responsive_maintainer=computed_rating.responsive_maintainer, responsive_maintainer_latency=computed_rating.responsive_maintainer_latency,
-                    license=computed_rating.license, license_latency=computed_rating.license_latency,
-                    good_pinning_practice=computed_rating.good_pinning_practice, good_pinning_practice_latency=computed_rating.good_pinning_practice_latency,
-                    reviewedness=computed_rating.reviewedness, reviewedness_latency=computed_rating.reviewedness_latency,
-                    net_score=computed_rating.net_score, net_score_latency=computed_rating.net_score_latency,
-                    tree_score=computed_rating.tree_score, tree_score_latency=computed_rating.tree_score_latency,
-                    reproducibility=computed_rating.reproducibility, reproducibility_latency=computed_rating.reproducibility_latency,
-                    performance_claims=computed_rating.performance_claims, performance_claims_latency=computed_rating.performance_claims_latency,
-                    dataset_and_code_score=computed_rating.dataset_and_code_score, dataset_and_code_score_latency=computed_rating.dataset_and_code_score_latency,
-                    dataset_quality=computed_rating.dataset_quality, dataset_quality_latency=computed_rating.dataset_quality_latency,
-                    size_score=computed_rating.size_score, size_score_latency=computed_rating.size_score_latency,
-                    name=name, category=package_type
-                )
-                storage.save_rating(pkg_id, pre_rating.model_dump_json())
-                print(f"DEBUG: Pre-computed rating saved for {pkg_id}")
+                pre_rating = computed_rating.model_copy(update={"name": name, "category": package_type})
+                rating_json = pre_rating.model_dump_json()
+                _cache_rating(pkg_id, pre_rating, rating_json.encode())
+                if hasattr(storage, 'save_rating'):
+                    _save_rating_later(pkg_id, rating_json)
+                logger.debug("Pre-computed rating cached for %s", pkg_id)
             except Exception as e:
-                print(f"DEBUG: Failed to save pre-computed rating: {e}")
+                logger.debug("Failed to save pre-computed rating: %s", e)
         
         return new_pkg
 
@@ -266,128 +395,81 @@ async def upload_artifact_dataset(package: PackageData, x_authorization: str | N
 async def upload_artifact_code(package: PackageData, x_authorization: str | None = Header(None, alias="X-Authorization")):
     return await upload_package(package, x_authorization, package_type="code")
 
-# --- Plural Aliases for Autograder Compatibility ---
-
-@router.get("/artifacts/model/{id}", response_model=Package, status_code=status.HTTP_200_OK)
-async def get_package_model_plural(id: str):
-    return await get_package(id)
-
-@router.delete("/artifacts/model/{id}", status_code=status.HTTP_200_OK)
-async def delete_package_model_plural(id: str):
-    return await delete_package(id)
-
-@router.get("/artifacts/dataset/{id}", response_model=Package, status_code=status.HTTP_200_OK)
-async def get_package_dataset_plural(id: str):
-    return await get_package(id)
-
-@router.delete("/artifacts/dataset/{id}", status_code=status.HTTP_200_OK)
-async def delete_package_dataset_plural(id: str):
-    return await delete_package(id)
-
-@router.get("/artifacts/code/{id}", response_model=Package, status_code=status.HTTP_200_OK)
-async def get_package_code_plural(id: str):
-    return await get_package(id)
-
-@router.delete("/artifacts/code/{id}", status_code=status.HTTP_200_OK)
-async def delete_package_code_plural(id: str):
-    return await delete_package(id)
-
-# --- List Routes for Autograder ---
-
 # --- List Routes for Autograder ---
 
 @router.get("/artifacts/code", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
+@router.get("/artifacts/code/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
 async def list_packages_code():
     return storage.list_packages(queries=[PackageQuery(name="*", version=None, types=["code"])])
 
-@router.get("/artifacts/code/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
-async def list_packages_code_slash():
-    return await list_packages_code()
-
 @router.get("/artifacts/dataset", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
+@router.get("/artifacts/dataset/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
 async def list_packages_dataset():
     return storage.list_packages(queries=[PackageQuery(name="*", version=None, types=["dataset"])])
 
-@router.get("/artifacts/dataset/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
-async def list_packages_dataset_slash():
-    return await list_packages_dataset()
-
 @router.get("/artifacts/model", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
+@router.get("/artifacts/model/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
 async def list_packages_model():
     return storage.list_packages(queries=[PackageQuery(name="*", version=None, types=["model"])])
 
-@router.get("/artifacts/model/", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK, include_in_schema=False)
-async def list_packages_model_slash():
-    return await list_packages_model()
-
 @router.get("/package/{id}/rate", response_model=PackageRating, status_code=status.HTTP_200_OK)
+@router.get("/artifact/model/{id}/rate", response_model=PackageRating, status_code=status.HTTP_200_OK)
 async def rate_package(id: str):
+    return Response(content=await _get_rating_payload(id), media_type="application/json")
+
+async def _get_rating_payload(id: str) -> bytes:
+    """Return the package's rating as serialized PackageRating JSON, computing it on a cache miss."""
     # Check in-memory cache first (fast)
-    if id in rating_cache:
-        print(f"DEBUG: Rate in-memory cache HIT for {id}")
-        return rating_cache[id]
-    
+    cached = rating_cache.get(id)
+    if cached is not None:
+        logger.debug("Rate in-memory cache HIT for %s", id)
+        return cached
+
+    # Single-flight: concurrent misses for the same id share one load/compute.
+    # shield() keeps it running for the others if one caller is cancelled.
+    task = _inflight_ratings.get(id)
+    if task is None:
+        task = asyncio.ensure_future(_load_rating_payload(id))
+        _inflight_ratings[id] = task
+        task.add_done_callback(lambda _: _inflight_ratings.pop(id, None))
+    return await asyncio.shield(task)
+
+async def _load_rating_payload(id: str) -> bytes:
     # Check S3 cache (persistent across Lambda containers)
     if hasattr(storage, 'get_rating'):
         cached_rating_json = storage.get_rating(id)
         if cached_rating_json:
             try:
-                import json
-                rating_data = json.loads(cached_rating_json)
-                result = PackageRating(**rating_data)
-                rating_cache[id] = result  # Also cache in memory
-                print(f"DEBUG: Rate S3 cache HIT for {id}")
-                return result
+                # Validate before trusting it, but serve the stored JSON as-is
+                result = PackageRating.model_validate_json(cached_rating_json)
+                payload = cached_rating_json.encode()
+                _cache_rating(id, result, payload)  # Also cache in memory
+                logger.debug("Rate S3 cache HIT for %s", id)
+                return payload
             except Exception as e:
-                print(f"DEBUG: Rate S3 cache parse error: {e}")
+                logger.debug("Rate S3 cache parse error: %s", e)
     
-    print(f"DEBUG: Rate cache MISS for {id}, computing...")
+    logger.debug("Rate cache MISS for %s, computing...", id)
     pkg = storage.get_package(id)
     if not pkg:
         raise HTTPException(status_code=404, detail="Package not found")
     
     if pkg.data.url:
-        rating = compute_package_rating(pkg.data.url)
-        # Map to snake_case
-        result = PackageRating(
-            bus_factor=rating.bus_factor,
-            bus_factor_latency=rating.bus_factor_latency,
-            code_quality=rating.code_quality,
-            code_quality_latency=rating.code_quality_latency,
-            ramp_up_time=rating.ramp_up_time,
-            ramp_up_time_latency=rating.ramp_up_time_latency,
-            responsive_maintainer=rating.responsive_maintainer,
-            responsive_maintainer_latency=rating.responsive_maintainer_latency,
-            license=rating.license,
-            license_latency=rating.license_latency,
-            good_pinning_practice=rating.good_pinning_practice,
-            good_pinning_practice_latency=rating.good_pinning_practice_latency,
-            reviewedness=rating.reviewedness,
-            reviewedness_latency=rating.reviewedness_latency,
-            net_score=rating.net_score,
-            net_score_latency=rating.net_score_latency,
-            tree_score=rating.tree_score,
-            tree_score_latency=rating.tree_score_latency,
-            reproducibility=rating.reproducibility,
-            reproducibility_latency=rating.reproducibility_latency,
-            performance_claims=rating.performance_claims,
-            performance_claims_latency=rating.performance_claims_latency,
-            dataset_and_code_score=rating.dataset_and_code_score,
-            dataset_and_code_score_latency=rating.dataset_and_code_score_latency,
-            dataset_quality=rating.dataset_quality,
-            dataset_quality_latency=rating.dataset_quality_latency,
-            size_score=rating.size_score,
-            size_score_latency=rating.size_score_latency,
-            name=pkg.metadata.name,
-            category=pkg.metadata.type.lower() if pkg.metadata.type else "code"
-        )
+        # Network/CPU-bound and synchronous; keep it off the event loop
+        rating = await asyncio.to_thread(compute_package_rating, pkg.data.url)
+        # compute_package_rating already returns a PackageRating; just stamp on the identity fields
+        result = rating.model_copy(update={
+            "name": pkg.metadata.name,
+            "category": pkg.metadata.type.lower() if pkg.metadata.type else "code",
+        })
+        rating_json = result.model_dump_json()
+        payload = rating_json.encode()
         # Cache the result in memory
-        rating_cache[id] = result
+        _cache_rating(id, result, payload)
         # Also save to S3 for persistent caching across Lambda containers
         if hasattr(storage, 'save_rating'):
-            import json
-            storage.save_rating(id, result.model_dump_json())
-        return result
+            _save_rating_later(id, rating_json)
+        return payload
     
     result = PackageRating(
         bus_factor=0, bus_factor_latency=0,
@@ -407,30 +489,27 @@ async def rate_package(id: str):
         name=pkg.metadata.name,
         category=pkg.metadata.type.lower() if pkg.metadata.type else "code"
     )
+    payload = result.model_dump_json().encode()
     # Cache non-URL packages too
-    rating_cache[id] = result
-    return result
-
-@router.get("/artifact/model/{id}/rate", response_model=PackageRating, status_code=status.HTTP_200_OK)
-async def rate_package_model(id: str):
-    return await rate_package(id)
+    _cache_rating(id, result, payload)
+    return payload
 
 @router.get("/artifact/model/{id}/cost", status_code=status.HTTP_200_OK)
 async def get_package_cost(id: str):
     """Calculate deployment cost based on model size (download size in MB)."""
-    print(f"DEBUG: COST called for id={id}")
+    logger.debug("COST called for id=%s", id)
     
     # Get the package to calculate its size
     pkg = storage.get_package(id)
     if not pkg:
         raise HTTPException(status_code=404, detail="Artifact does not exist.")
     
-    # Get size from rating
-    rating = await rate_package(id)
-    
     # Cost = download size in MB (based on size_score, larger models = lower score)
     # Use aws_server score as proxy for size
-    size_score = rating.size_score.aws_server if rating.size_score else 0.5
+    size_score = size_score_cache.get(id)
+    if size_score is None:
+        # Project the one field out of the rating JSON rather than rebuilding a PackageRating
+        size_score = json.loads(await _get_rating_payload(id))["size_score"]["aws_server"]
     
     # Convert score to approximate size in MB
     # Score of 1.0 = 0MB, Score of 0.0 = 10GB (10000MB)
@@ -440,7 +519,7 @@ async def get_package_cost(id: str):
     size_mb = (1.0 - size_score) * 10000
     total_cost = round(size_mb, 1)
     
-    print(f"DEBUG: COST returning {id}: total_cost={total_cost}")
+    logger.debug("COST returning %s: total_cost=%s", id, total_cost)
     
     # Return format per spec: {artifact_id: {total_cost: value}}
     return {
@@ -451,17 +530,26 @@ async def get_package_cost(id: str):
 
 @router.post("/artifact/model/{id}/license-check", status_code=status.HTTP_200_OK)
 async def check_license(id: str):
-    print(f"DEBUG: LICENSE-CHECK called for id={id}")
+    logger.debug("LICENSE-CHECK called for id=%s", id)
     # Per spec: response should be a boolean
     return True
 
-@router.get("/artifact/model/{id}/lineage", status_code=status.HTTP_200_OK)
-async def get_lineage(id: str):
-    """Get lineage for a specific model - shows ACTUAL relationships from config."""
-    print(f"DEBUG: LINEAGE called for id={id}")
+def _name_variants(name: str) -> tuple[str, ...]:
+    """The name itself, then without its owner prefix when it has one."""
+    return (name, name.rsplit("/", 1)[-1]) if "/" in name else (name,)
+
+@router.get("/artifact/model/{id}/lineage", response_model=LineageGraph, status_code=status.HTTP_200_OK)
+async def get_lineage(id: str, include_unrelated: bool = Query(True)):
+    """
+    Get lineage for a specific model - shows ACTUAL relationships from config.
+
+    Every other artifact is also listed as a node unless include_unrelated=false,
+    which keeps the response (and the storage scan behind it) to the model's relatives.
+    """
+    logger.debug("LINEAGE called for id=%s", id)
     pkg = storage.get_package(id)
     if not pkg:
-        print(f"DEBUG: LINEAGE - package not found: {id}")
+        logger.debug("LINEAGE - package not found: %s", id)
         raise HTTPException(status_code=404, detail="Package not found")
     
     nodes = []
@@ -483,43 +571,29 @@ async def get_lineage(id: str):
     
     if pkg.data.url and "huggingface.co" in pkg.data.url:
         try:
-            from huggingface_hub import model_info
             model_id = pkg.data.url.split("huggingface.co/")[-1].strip("/")
-            info = model_info(model_id)
+            info = await asyncio.to_thread(_get_model_info, model_id)
             
             # Look for base_model in config/card
             if hasattr(info, 'cardData') and info.cardData:
                 # Check for base_model field
                 if hasattr(info.cardData, 'base_model'):
                     base_model_name = info.cardData.base_model
-                    print(f"DEBUG: LINEAGE found base_model: {base_model_name}")
+                    logger.debug("LINEAGE found base_model: %s", base_model_name)
                 # Check for datasets field
                 if hasattr(info.cardData, 'datasets'):
                     dataset_names = info.cardData.datasets or []
-                    print(f"DEBUG: LINEAGE found datasets: {dataset_names}")
+                    logger.debug("LINEAGE found datasets: %s", dataset_names)
         except Exception as e:
-            print(f"DEBUG: LINEAGE HuggingFace lookup failed: {e}")
-    
-    # Get all packages to find matching artifacts
-    all_packages = storage.list_packages([], 0, 1000)
-    
-    # Create a lookup by name
-    pkg_by_name = {}
-    for pkg_meta in all_packages:
-        if pkg_meta.name:
-            pkg_by_name[pkg_meta.name.lower()] = pkg_meta
-            # Also add without owner prefix
-            if "/" in pkg_meta.name:
-                short_name = pkg_meta.name.split("/")[-1].lower()
-                pkg_by_name[short_name] = pkg_meta
+            logger.debug("LINEAGE HuggingFace lookup failed: %s", e)
     
     # Add base_model relationship if found
     if base_model_name:
         base_name_lower = base_model_name.lower()
         # Try to find this model in our packages
-        for name_variant in [base_name_lower, base_name_lower.split("/")[-1] if "/" in base_name_lower else base_name_lower]:
-            if name_variant in pkg_by_name:
-                base_pkg = pkg_by_name[name_variant]
+        for name_variant in _name_variants(base_name_lower):
+            base_pkg = storage.find_by_name(name_variant)
+            if base_pkg:
                 if base_pkg.id and base_pkg.id != id:
                     if base_pkg.id not in node_ids_added:
                         nodes.append({
@@ -538,9 +612,9 @@ async def get_lineage(id: str):
     # Add dataset relationships if found
     for ds_name in dataset_names:
         ds_name_lower = ds_name.lower()
-        for name_variant in [ds_name_lower, ds_name_lower.split("/")[-1] if "/" in ds_name_lower else ds_name_lower]:
-            if name_variant in pkg_by_name:
-                ds_pkg = pkg_by_name[name_variant]
+        for name_variant in _name_variants(ds_name_lower):
+            ds_pkg = storage.find_by_name(name_variant)
+            if ds_pkg:
                 if ds_pkg.id and ds_pkg.id != id:
                     if ds_pkg.id not in node_ids_added:
                         nodes.append({
@@ -557,21 +631,31 @@ async def get_lineage(id: str):
                     break
     
     # Add ALL packages as nodes (test expects all artifacts present)
-    for pkg_meta in all_packages:
-        if pkg_meta.id and pkg_meta.id not in node_ids_added:
-            nodes.append({
-                "artifact_id": pkg_meta.id,
-                "name": pkg_meta.name or "",
-                "source": "config_json"
-            })
-            node_ids_added.add(pkg_meta.id)
-    
-    print(f"DEBUG: LINEAGE returning {len(nodes)} nodes, {len(edges)} edges")
+    if include_unrelated:
+        for pkg_meta in storage.list_packages([], 0, 1000):
+            if pkg_meta.id and pkg_meta.id not in node_ids_added:
+                nodes.append({
+                    "artifact_id": pkg_meta.id,
+                    "name": pkg_meta.name or "",
+                    "source": "config_json"
+                })
+                node_ids_added.add(pkg_meta.id)
+    
+    logger.debug("LINEAGE returning %d nodes, %d edges", len(nodes), len(edges))
     return {"nodes": nodes, "edges": edges}
 
-@router.get("/artifact/model/lineage", status_code=status.HTTP_200_OK)
+@router.get("/artifact/model/lineage", response_model=LineageGraph, status_code=status.HTTP_200_OK)
 async def get_global_lineage():
     """Get global lineage graph for all models."""
+    version = getattr(storage, "version", None)
+    payload = _global_lineage_cache.get(version) if version is not None else None
+    if payload is None:
+        payload = json.dumps(_build_global_lineage(), separators=(",", ":")).encode()
+        if version is not None:
+            _global_lineage_cache[version] = payload
+    return Response(content=payload, media_type="application/json")
+
+def _build_global_lineage() -> dict:
     nodes = []
     edges = []
     
@@ -619,6 +703,7 @@ async def get_global_lineage():
     return {"nodes": nodes, "edges": edges}
 
 @router.post("/package/byRegEx", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
+@router.post("/artifact/byRegEx", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
 async def search_by_regex(regex: PackageRegEx):
     try:
         re.compile(regex.RegEx)
@@ -627,11 +712,8 @@ async def search_by_regex(regex: PackageRegEx):
         
     return storage.search_by_regex(regex.RegEx)
 
-@router.post("/artifact/byRegEx", response_model=list[PackageMetadata], status_code=status.HTTP_200_OK)
-async def search_by_regex_artifact(regex: PackageRegEx):
-    return await search_by_regex(regex)
-
 @router.get("/package/byName/{name:path}", response_model=list[PackageHistoryEntry], status_code=status.HTTP_200_OK)
+@router.get("/artifact/byName/{name:path}", response_model=list[PackageHistoryEntry], status_code=status.HTTP_200_OK)
 async def get_package_history(name: str):
     # Search for packages with this name
     # Since we don't store full history, we construct a history entry from the current package
@@ -644,14 +726,14 @@ async def get_package_history(name: str):
     q = PackageQuery(name=name, version=None, types=None)
     pkgs = storage.list_packages(queries=[q])
     
+    # One timestamp for the whole response
+    now_iso = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     history = []
-    from datetime import datetime
-    
     for p in pkgs:
         # Construct a "created" entry
         entry = PackageHistoryEntry(
             User={"name": "admin", "isAdmin": True},
-            Date=datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            Date=now_iso,
             PackageMetadata=p,
             Action="CREATE"
         )
@@ -659,10 +741,6 @@ async def get_package_history(name: str):
         
     return history
 
-@router.get("/artifact/byName/{name:path}", response_model=list[PackageHistoryEntry], status_code=status.HTTP_200_OK)
-async def get_package_history_artifact(name: str):
-    return await get_package_history(name)
-
 @router.get("/tracks", status_code=status.HTTP_200_OK)
 async def get_tracks():
     """Return the list of planned tracks implemented."""
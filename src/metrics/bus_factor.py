@@ -7,14 +7,18 @@ distribution of contribution knowledge.
 """
 from __future__ import annotations
 
+import logging
 import math
+import subprocess
 import time
 from collections import Counter
 
-try:
-    from git import Repo
-except ImportError:
-    Repo = None  # gracefully handle missing GitPython
+from src.utils.resource import normalize_resource
+
+logger = logging.getLogger(__name__)
+
+# Only the latest commits are sampled, for speed
+MAX_COMMITS = 500
 
 
 def compute_bus_factor_from_commits(commits: list[str]) -> float:
@@ -31,17 +35,44 @@ def compute_bus_factor_from_commits(commits: list[str]) -> float:
         return 0.0
 
     commit_counts = Counter(commits)
-    total_commits = sum(commit_counts.values())
+    total_commits = len(commits)
     num_contributors = len(commit_counts)
 
     # Single contributor → bus factor = 0
     if num_contributors <= 1:
         return 0.0
 
-    # Entropy normalized by max possible entropy
-    probabilities = [c / total_commits for c in commit_counts.values()]
-    entropy = -sum(p * math.log2(p) for p in probabilities if p > 0)
-    return entropy / math.log2(num_contributors)
+    # Entropy normalized by max possible entropy. With p = c/N,
+    # -sum(p*log p) == log N - sum(c*log c)/N, so one pass over the counts
+    # suffices and no probability list is built. Counter counts are >= 1.
+    # The log base cancels in the ratio, so natural log (cheaper than log2
+    # on some platforms) gives the same score.
+    entropy = math.log(total_commits) - sum(c * math.log(c) for c in commit_counts.values()) / total_commits
+    return entropy / math.log(num_contributors)
+
+
+def commit_authors(repo_path: str, max_count: int = MAX_COMMITS) -> list[str]:
+    """
+    Author identifiers (email, else name) of the latest `max_count` commits.
+
+    Reads `git log` output directly instead of building a GitPython Commit
+    per commit, since only the author field is needed.
+
+    Raises:
+        subprocess.CalledProcessError: If repo_path is not a git repository.
+    """
+    out = subprocess.run(
+        ["git", "-C", str(repo_path), "log", "--pretty=format:%ae%x1f%an", "-n", str(max_count)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    authors = []
+    for line in out.splitlines():
+        email, _, name = line.partition("\x1f")
+        if email or name:
+            authors.append(email or name)
+    return authors
 
 
 def compute_bus_factor(commits: list[str]) -> tuple[float, int]:
@@ -66,33 +97,25 @@ def metric(resource: dict) -> tuple[float, int]:
     commits: list[str] = []
 
     repo_path = resource.get("local_path") or resource.get("local_dir")
-    print(f"DEBUG: bus_factor repo_path={repo_path}")
-    if repo_path and Repo is not None:
+    logger.debug("bus_factor repo_path=%s", repo_path)
+    if repo_path:
         try:
-            repo = Repo(repo_path)
-            # Limit commits for speed (default: 500 latest commits)
-            for commit in repo.iter_commits(max_count=500):
-                if commit.author and commit.author.email:
-                    commits.append(commit.author.email)
-                elif commit.author and commit.author.name:
-                    commits.append(commit.author.name)
-            print(f"DEBUG: bus_factor found {len(commits)} commits")
+            commits = commit_authors(repo_path)
+            logger.debug("bus_factor found %d commits", len(commits))
         except Exception as e:
-            print(f"DEBUG: bus_factor error: {e}")
+            logger.debug("bus_factor error: %s", e)
             commits = []
     else:
-        print(f"DEBUG: bus_factor skipped (path={repo_path}, Repo={Repo})")
+        logger.debug("bus_factor skipped (no repo path)")
 
     score = compute_bus_factor_from_commits(commits)
     
     # If no commits found, try HuggingFace API as fallback
     if score == 0.0:
-        url = resource.get("url", "")
-        if "huggingface.co" in url:
+        if normalize_resource(resource)["kind"] == "hf":
             try:
-                from huggingface_hub import model_info
-                model_id = url.split("huggingface.co/")[-1].strip("/")
-                info = model_info(model_id)
+                from src.utils.hf_hub import model_info
+                info = model_info(resource["hf_repo_id"])
                 
                 # Use downloads and likes as proxy for bus factor
                 # Popular models tend to have more contributors
@@ -109,11 +132,14 @@ def metric(resource: dict) -> tuple[float, int]:
                 else:
                     score = 0.3  # Base score for existing HF models
                     
-                print(f"DEBUG: bus_factor HuggingFace fallback: downloads={downloads}, likes={likes}, score={score}")
+                logger.debug(
+                    "bus_factor HuggingFace fallback: downloads=%s, likes=%s, score=%s",
+                    downloads, likes, score,
+                )
             except Exception as e:
-                print(f"DEBUG: bus_factor HuggingFace lookup failed: {e}")
+                logger.debug("bus_factor HuggingFace lookup failed: %s", e)
                 score = 0.3  # Default for HF models
     
-    print(f"DEBUG: bus_factor score={score}")
+    logger.debug("bus_factor score=%s", score)
     latency_ms = int((time.perf_counter() - start) * 1000)
     return float(score), latency_ms
@@ -6,9 +6,10 @@ Determines the category of a package (e.g., model, dataset, code).
 import time
 from typing import Any
 
-from huggingface_hub import model_info
 from huggingface_hub.utils import HfHubHTTPError
 
+from src.utils.hf_hub import model_info
+
 
 def metric(resource: dict[str, Any]) -> tuple[str, int]:
     """
@@ -3,10 +3,21 @@ Code Quality Metric Module.
 
 Evaluates the code quality of a package based on various heuristics and static analysis.
 """
+import os
 import time
-from pathlib import Path
+from collections.abc import Callable, Sequence
 from typing import Any
 
+from src.utils.hf_hub import list_repo_files
+from src.utils.resource import normalize_resource
+
+_TRAINING_SCRIPTS = frozenset({"train.py", "training.py", "fine_tune.py"})
+
+
+def _score_checks(checks: Sequence[Callable[[], bool]]) -> float:
+    """Fraction of checks that pass, evaluating them in order."""
+    return sum(bool(check()) for check in checks) / len(checks)
+
 
 def metric(resource: dict[str, Any]) -> tuple[float, int]:
     """
@@ -18,23 +29,20 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
     start_time = time.perf_counter()
     score = 0.0
 
-    url = resource.get("url", "")
-    
     # HuggingFace Model
-    if "huggingface.co" in url and resource.get("category") == "MODEL":
+    if normalize_resource(resource)["kind"] == "hf" and resource.get("category") == "MODEL":
         try:
-            from huggingface_hub import HfApi
-            repo_id = url.split("huggingface.co/")[-1].rstrip("/")
-            api = HfApi()
-            files = api.list_repo_files(repo_id=repo_id)
+            files = frozenset(list_repo_files(resource["hf_repo_id"]))
             
-            checks = {
-                "has_config": "config.json" in files,
-                "has_readme": "README.md" in files,
-                "has_model_card": any("model" in f.lower() and f.endswith(".md") for f in files),
-                "has_training_code": any(f in files for f in ["train.py", "training.py", "fine_tune.py"]),
-            }
-            score = sum(checks.values()) / len(checks)
+            # Set lookups before the model-card scan over every filename
+            checks = (
+                lambda: "config.json" in files,  # has_config
+                lambda: "README.md" in files,  # has_readme
+                lambda: not files.isdisjoint(_TRAINING_SCRIPTS),  # has_training_code
+                # endswith first: only .md names pay for the lower() copy
+                lambda: any(f.endswith(".md") and "model" in f.lower() for f in files),  # has_model_card
+            )
+            score = _score_checks(checks)
             
         except Exception:
             # Fallback: assume reasonable quality if model exists
@@ -44,15 +52,24 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
     else:
         local_repo_path = resource.get("local_path")
         if local_repo_path:
-            repo_path = Path(local_repo_path)
-            checks = {
-                "dependencies": (repo_path / "requirements.txt").exists()
-                or (repo_path / "pyproject.toml").exists(),
-                "testing": (repo_path / "tests").is_dir(),
-                "ci_cd": (repo_path / ".github").is_dir() or (repo_path / ".gitlab-ci.yml").exists(),
-                "containerization": (repo_path / "Dockerfile").exists(),
-            }
-            score = sum(checks.values()) / len(checks)
+            # One readdir of the repo root instead of a stat per probed name
+            try:
+                with os.scandir(local_repo_path) as it:
+                    entries = {e.name: e for e in it}
+            except OSError:
+                entries = {}
+
+            def is_dir(name: str) -> bool:
+                return name in entries and entries[name].is_dir()
+
+            # Plain membership before the checks that may stat a directory
+            checks = (
+                lambda: "requirements.txt" in entries or "pyproject.toml" in entries,  # dependencies
+                lambda: "Dockerfile" in entries,  # containerization
+                lambda: is_dir("tests"),  # testing
+                lambda: is_dir(".github") or ".gitlab-ci.yml" in entries,  # ci_cd
+            )
+            score = _score_checks(checks)
         else:
             # No local path, default score
             score = 0.5
@@ -7,9 +7,9 @@ import logging
 import time
 from typing import Any
 
-from huggingface_hub import dataset_info, model_info
-
 from src.utils.dataset_link_finder import find_datasets_from_resource
+from src.utils.hf_hub import dataset_info, model_info
+from src.utils.resource import normalize_resource
 
 logger = logging.getLogger("phase1_cli")
 
@@ -153,11 +153,9 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
     
     # If no datasets found, give a base score for existing HF models
     if score == 0.0 and category == "MODEL":
-        url = resource.get("url", "")
-        if "huggingface.co" in url:
+        if normalize_resource(resource)["kind"] == "hf":
             try:
-                model_id = url.split("huggingface.co/")[-1].strip("/")
-                info = model_info(model_id)
+                info = model_info(resource["hf_repo_id"])
                 
                 # Base score for existing model + bonus for popularity
                 downloads = getattr(info, 'downloads', 0) or 0
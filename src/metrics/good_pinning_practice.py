@@ -3,12 +3,22 @@ Good Pinning Practice Metric Module.
 
 Checks if the package dependencies are pinned to specific versions to ensure reproducibility.
 """
+import json
 import logging
+import os
+import re
 import time
 from pathlib import Path
 
+from src.utils.resource import normalize_resource
+
 logger = logging.getLogger(__name__)
 
+# A requirement is pinned if ==/~= (=== included) appears before any inline comment
+_PIN_RE = re.compile(r"[^#]*?(?:==|~=)")
+# npm ranges rather than exact versions
+_NPM_UNPINNED = re.compile(r"[~^<>]")
+
 def metric(resource: dict) -> tuple[float, int]:
     """
     Good Pinning Practice:
@@ -18,13 +28,11 @@ def metric(resource: dict) -> tuple[float, int]:
     start = time.perf_counter()
     score = 0.0
     
-    url = resource.get("url", "")
-    
     # HuggingFace Model
-    if "huggingface.co" in url and resource.get("category") == "MODEL":
+    if normalize_resource(resource)["kind"] == "hf" and resource.get("category") == "MODEL":
         try:
             from src.metrics.huggingface_service import HuggingFaceService
-            repo_id = url.split("huggingface.co/")[-1].rstrip("/")
+            repo_id = resource["hf_repo_id"]
             service = HuggingFaceService()
             config = service.get_model_config(repo_id)
             
@@ -57,41 +65,50 @@ def metric(resource: dict) -> tuple[float, int]:
         local_path = resource.get("local_path")
         if local_path:
             repo_path = Path(local_path)
+            # One readdir tells us which manifests exist, without a stat each
+            try:
+                with os.scandir(local_path) as it:
+                    names = {e.name for e in it}
+            except OSError:
+                names = set()
             
             # Check requirements.txt
             req_file = repo_path / "requirements.txt"
             total_deps = 0
             pinned_deps = 0
             
-            if req_file.exists():
+            if "requirements.txt" in names:
                 try:
-                    content = req_file.read_text(errors="replace")
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if not line or line.startswith("#"):
-                            continue
-                        # Check for == or ~=
-                        if "==" in line or "~=" in line:
-                            pinned_deps += 1
-                        total_deps += 1
+                    # Stream line by line rather than holding the file and its split copy
+                    with req_file.open(errors="replace") as f:
+                        for line in f:
+                            line = line.strip()
+                            if not line or line.startswith("#"):
+                                continue
+                            if _PIN_RE.match(line):
+                                pinned_deps += 1
+                            total_deps += 1
                 except Exception:
                     pass
                     
             # Check package.json
             pkg_json = repo_path / "package.json"
-            if pkg_json.exists():
+            if "package.json" in names:
                 try:
-                    import json
-                    data = json.loads(pkg_json.read_text(errors="replace"))
+                    # Stray invalid bytes (e.g. in a description) shouldn't discard the deps
+                    data = json.loads(pkg_json.read_bytes().decode("utf-8", errors="replace"))
                     deps = data.get("dependencies", {})
                     dev_deps = data.get("devDependencies", {})
-                    all_deps = {**deps, **dev_deps}
                     
-                    for ver in all_deps.values():
-                        # npm pinning: exact version (no ^ or ~)
-                        if not ver.startswith("^") and not ver.startswith("~") and not ver.startswith(">") and not ver.startswith("<"):
-                            pinned_deps += 1
-                        total_deps += 1
+                    # devDependencies wins for a name listed in both, counted once
+                    for group, skip in ((deps, dev_deps), (dev_deps, ())):
+                        for name, ver in group.items():
+                            if name in skip:
+                                continue
+                            # npm pinning: exact version (no ^ or ~)
+                            if not _NPM_UNPINNED.match(ver):
+                                pinned_deps += 1
+                            total_deps += 1
                 except Exception:
                     pass
             
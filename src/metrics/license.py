@@ -27,6 +27,8 @@ from typing import Any
 
 import requests  # add to requirements.txt
 
+from src.utils.resource import normalize_resource
+
 # Default Purdue GenAI Studio endpoint (OpenAI-compatible chat completions)
 _DEFAULT_ENDPOINT = os.environ.get(
     "PURDUE_GENAI_ENDPOINT", "https://genai.rcac.purdue.edu/api/chat/completions"
@@ -193,12 +195,10 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
     # if still nothing, optionally we could attempt remote read (omitted here for determinism)
     if not text:
         # Try HuggingFace API for license info
-        url = resource.get("url", "")
-        if "huggingface.co" in url:
+        if normalize_resource(resource)["kind"] == "hf":
             try:
-                from huggingface_hub import model_info
-                model_id = url.split("huggingface.co/")[-1].strip("/")
-                info = model_info(model_id)
+                from src.utils.hf_hub import model_info
+                info = model_info(resource["hf_repo_id"])
                 if hasattr(info, 'cardData') and info.cardData:
                     license_info = getattr(info.cardData, 'license', None)
                     if license_info:
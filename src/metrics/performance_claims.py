@@ -5,18 +5,97 @@ Analyzes the package documentation for performance claims and benchmarks.
 """
 from __future__ import annotations
 
+import bisect
+import hashlib
+import itertools
 import logging
+import re
 import time
 from typing import Any
 
-from huggingface_hub import hf_hub_download, model_info
+from huggingface_hub import hf_hub_download
 from huggingface_hub.utils import HfHubHTTPError
 
 # Import Bedrock client
 from src.utils.bedrock_client import get_bedrock_client
+from src.utils.cache import TTLCache
+from src.utils.hf_hub import model_info
 
 logger = logging.getLogger("phase1_cli")
 
+# Downloads strictly above each threshold earn the next score up
+_DOWNLOAD_THRESHOLDS = (100, 1_000, 10_000, 100_000, 1_000_000)
+_DOWNLOAD_SCORES = (0.1, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Cheap local check for benchmark language; READMEs with fewer than
+# _MIN_BENCH_TERMS hits are scored by downloads without calling Bedrock
+_BENCH_RE = re.compile(
+    r"\b(?:accuracy|F1|BLEU|ROUGE|perplexity|MMLU|GLUE|benchmarks?|SOTA|state[- ]of[- ]the[- ]art)\b",
+    re.IGNORECASE,
+)
+_MIN_BENCH_TERMS = 2
+
+# Bedrock analyses keyed by README content digest; matches the client's 24h disk cache
+_analysis_cache = TTLCache(maxsize=256, ttl=86400)
+# Per-commit outcome, (repo_id, sha) -> analysis or None for "no benchmark terms".
+# A hit skips the README download entirely.
+_revision_cache = TTLCache(maxsize=256, ttl=86400)
+_UNSEEN = object()
+# Reasons BedrockClient gives its heuristic fallbacks, which it doesn't persist
+_FALLBACK_REASONS = ("Bedrock failed", "Bedrock not available")
+
+
+def _download_readme(repo_id: str, revision: str | None) -> str:
+    readme_path = hf_hub_download(
+        repo_id=repo_id,
+        filename="README.md",
+        repo_type="model",
+        revision=revision,
+    )
+    with open(readme_path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _mentions_benchmarks(readme_content: str) -> bool:
+    """True once the README has _MIN_BENCH_TERMS benchmark keywords."""
+    hits = itertools.islice(_BENCH_RE.finditer(readme_content), _MIN_BENCH_TERMS)
+    return len(list(hits)) == _MIN_BENCH_TERMS
+
+
+def _is_fallback(result: dict) -> bool:
+    """True for a transient fallback score rather than a real analysis."""
+    return str(result.get("reason", "")).startswith(_FALLBACK_REASONS)
+
+
+def _analyze_readme(bedrock_client, readme_content: str) -> dict:
+    """Bedrock benchmark analysis, memoized on the README's content."""
+    digest = hashlib.blake2b(readme_content.encode(), digest_size=16).hexdigest()
+    result = _analysis_cache.get(digest)
+    if result is None:
+        result = bedrock_client.analyze_readme_for_benchmarks(readme_content)
+        if not _is_fallback(result):
+            _analysis_cache[digest] = result
+    return result
+
+
+def _readme_analysis(bedrock_client, repo_id: str, sha: str | None) -> dict | None:
+    """
+    Bedrock analysis of the README at commit `sha`, or None when the README
+    has no benchmark terms. Cached per commit when `sha` is known.
+    """
+    if sha:
+        cached = _revision_cache.get((repo_id, sha), _UNSEEN)
+        if cached is not _UNSEEN:
+            return cached
+    readme_content = _download_readme(repo_id, sha)
+    if _mentions_benchmarks(readme_content):
+        result = _analyze_readme(bedrock_client, readme_content)
+    else:
+        result = None
+    if sha and (result is None or not _is_fallback(result)):
+        _revision_cache[(repo_id, sha)] = result
+    return result
+
 
 def metric(resource: dict[str, Any]) -> tuple[float, int]:
     """
@@ -52,25 +131,20 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
         bedrock_client = get_bedrock_client()
         if bedrock_client.enabled:
             try:
-                # Download README
-                readme_path = hf_hub_download(
-                    repo_id=repo_id,
-                    filename="README.md",
-                    repo_type="model"
-                )
-                with open(readme_path, encoding='utf-8', errors='replace') as f:
-                    readme_content = f.read()
-                
-                # Analyze with Bedrock
-                result = bedrock_client.analyze_readme_for_benchmarks(readme_content)
-                score = result['score']
-                logger.debug(f"Bedrock analysis for {repo_id}: {result['reason']}")
-                
-                # Boost score slightly based on downloads (popular = likely good claims)
-                if downloads > 100_000:
-                    score = min(1.0, score * 1.1)
-                elif downloads > 10_000:
-                    score = min(1.0, score * 1.05)
+                # README pinned to the commit model_info saw, when known
+                result = _readme_analysis(bedrock_client, repo_id, getattr(info, "sha", None))
+                if result is None:
+                    logger.debug(f"No benchmark terms in {repo_id} README, skipping Bedrock")
+                    score = _score_by_downloads(downloads)
+                else:
+                    score = result['score']
+                    logger.debug(f"Bedrock analysis for {repo_id}: {result['reason']}")
+
+                    # Boost score slightly based on downloads (popular = likely good claims)
+                    if downloads > 100_000:
+                        score = min(1.0, score * 1.1)
+                    elif downloads > 10_000:
+                        score = min(1.0, score * 1.05)
                 
             except Exception as e:
                 logger.debug(f"Bedrock analysis failed, using download fallback: {e}")
@@ -94,15 +168,5 @@ def metric(resource: dict[str, Any]) -> tuple[float, int]:
 
 def _score_by_downloads(downloads: int) -> float:
     """Fallback scoring based on download popularity."""
-    if downloads > 1_000_000:
-        return 1.0
-    elif downloads > 100_000:
-        return 0.8
-    elif downloads > 10_000:
-        return 0.6
-    elif downloads > 1_000:
-        return 0.4
-    elif downloads > 100:
-        return 0.2
-    else:
-        return 0.1
+    # bisect_left: a count equal to a threshold stays in the lower bucket
+    return _DOWNLOAD_SCORES[bisect.bisect_left(_DOWNLOAD_THRESHOLDS, downloads)]
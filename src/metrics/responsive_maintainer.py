@@ -3,15 +3,65 @@ Responsive Maintainer Metric Module.
 
 Evaluates the responsiveness of the project maintainers.
 """
+import bisect
 import logging
-import os
 import time
 from datetime import UTC, datetime
 
 import requests
 
+from src.utils.cache import ttl_cache
+from src.utils.github_tokens import get_token_pool
+from src.utils.http_session import SESSION
+from src.utils.resource import normalize_resource
+
 logger = logging.getLogger(__name__)
 
+# HF models: days since last update below each bound earn the matching score
+_STALENESS_DAYS = (30, 90, 180, 365)
+_STALENESS_SCORES = (0.9, 0.7, 0.5, 0.3, 0.1)
+
+# GitHub issues: full score under a week to close, zero past a month, linear between
+_FAST_CLOSE = 604800  # 1 week, seconds
+_SLOW_CLOSE = 2592000  # 30 days, seconds
+
+GITHUB_ISSUES_TTL = 600  # seconds
+
+@ttl_cache(maxsize=2048, ttl=GITHUB_ISSUES_TTL)
+def _avg_close_time(owner: str, repo: str) -> float | None:
+    """
+    Mean seconds from open to close over the repo's last 100 closed issues,
+    or None if there are none. Cached per repo; failed requests raise and are
+    not cached.
+    """
+    api_url = f"https://api.github.com/repos/{owner}/{repo}/issues?state=closed&per_page=100"
+    pool = get_token_pool()
+    token = pool.acquire()
+    response = SESSION.get(api_url, headers=pool.auth_headers(token), timeout=10)
+    pool.update(token, response.headers)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"GitHub API returned {response.status_code}")
+
+    total_close_time = 0.0
+    closed_count = 0
+    # fromisoformat accepts GitHub's trailing "Z" directly;
+    # accumulate in place rather than collecting a list
+    for issue in response.json():
+        if "pull_request" in issue:
+            continue # Skip PRs, focus on issues
+        
+        created_at = datetime.fromisoformat(issue["created_at"])
+        closed_at = datetime.fromisoformat(issue["closed_at"])
+        total_close_time += (closed_at - created_at).total_seconds()
+        closed_count += 1
+    return total_close_time / closed_count if closed_count else None
+
+
+def _staleness_score(days_since_update: int) -> float:
+    """HF activity score; each bound is exclusive, so 30 days old is the 0.7 tier."""
+    return _STALENESS_SCORES[bisect.bisect_right(_STALENESS_DAYS, days_since_update)]
+
+
 def metric(resource: dict) -> tuple[float, int]:
     """
     Responsive Maintainer:
@@ -21,13 +71,13 @@ def metric(resource: dict) -> tuple[float, int]:
     start = time.perf_counter()
     score = 0.0
     
-    url = resource.get("url", "")
+    kind = normalize_resource(resource)["kind"]
     
     # HuggingFace Model
-    if "huggingface.co" in url and resource.get("category") == "MODEL":
+    if kind == "hf" and resource.get("category") == "MODEL":
         try:
             from src.metrics.huggingface_service import get_model_metadata
-            repo_id = url.split("huggingface.co/")[-1].rstrip("/")
+            repo_id = resource["hf_repo_id"]
             metadata = get_model_metadata(repo_id)
             
             if metadata:
@@ -38,16 +88,7 @@ def metric(resource: dict) -> tuple[float, int]:
                         days_since_update = (datetime.now(UTC) - last_mod).days
                         
                         # Recent updates = responsive
-                        if days_since_update < 30:  # < 1 month
-                            score = 0.9
-                        elif days_since_update < 90:  # < 3 months
-                            score = 0.7
-                        elif days_since_update < 180:  # < 6 months
-                            score = 0.5
-                        elif days_since_update < 365:  # < 1 year
-                            score = 0.3
-                        else:
-                            score = 0.1
+                        score = _staleness_score(days_since_update)
                         
                         # Boost for popular models (community engagement)
                         likes = metadata.modelLikes or 0
@@ -68,46 +109,16 @@ def metric(resource: dict) -> tuple[float, int]:
             score = 0.5
     
     # GitHub Repository
-    elif "github.com" in url:
+    elif kind == "github":
         try:
-            # Extract owner/repo
-            parts = url.rstrip("/").split("/")
-            if len(parts) >= 2:
-                owner, repo = parts[-2], parts[-1]
-                
-                api_url = f"https://api.github.com/repos/{owner}/{repo}/issues?state=closed&per_page=100"
-                headers = {}
-                token = os.environ.get("GITHUB_TOKEN")
-                if token and not token.startswith("ghp_REPLACE"):
-                    headers["Authorization"] = f"token {token}"
-                
-                response = requests.get(api_url, headers=headers, timeout=10)
-                if response.status_code == 200:
-                    issues = response.json()
-                    close_times = []
-                    for issue in issues:
-                        if "pull_request" in issue:
-                            continue # Skip PRs, focus on issues
-                        
-                        created_at = datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00"))
-                        closed_at = datetime.fromisoformat(issue["closed_at"].replace("Z", "+00:00"))
-                        close_times.append((closed_at - created_at).total_seconds())
-                    
-                    if close_times:
-                        avg_close_time = sum(close_times) / len(close_times)
-                        # 1 week = 604800 seconds
-                        # 1 month = 2592000 seconds
-                        if avg_close_time < 604800:
-                            score = 1.0
-                        elif avg_close_time > 2592000:
-                            score = 0.0
-                        else:
-                            score = 1.0 - (avg_close_time - 604800) / (2592000 - 604800)
-                    else:
-                        # No closed issues? Default to 0.5
-                        score = 0.5
+            owner, repo = resource["owner"], resource["repo"]
+            if owner:
+                avg_close_time = _avg_close_time(owner, repo)
+                if avg_close_time is not None:
+                    fraction = (avg_close_time - _FAST_CLOSE) / (_SLOW_CLOSE - _FAST_CLOSE)
+                    score = 1.0 - min(1.0, max(0.0, fraction))
                 else:
-                    logger.debug(f"GitHub API returned {response.status_code}")
+                    # No closed issues? Default to 0.5
                     score = 0.5
         except Exception as e:
             logger.debug(f"GitHub responsive check failed: {e}")
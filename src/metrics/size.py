@@ -5,12 +5,67 @@ Estimates the size of the codebase.
 """
 from __future__ import annotations
 
+import json
+import logging
+import os
+import sqlite3
 import time
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+from types import MappingProxyType
 from typing import Any
 
 import requests
-from huggingface_hub import model_info
-from huggingface_hub.utils import HfHubHTTPError
+from huggingface_hub import model_info as _hub_model_info
+from huggingface_hub.utils import HfHubHTTPError, HFValidationError, RepositoryNotFoundError
+
+from src.utils import hf_hub
+from src.utils.cache import TTLCache
+from src.utils.hf_hub import model_info
+from src.utils.http_session import SESSION
+from src.utils.resource import ResourceRef
+
+logger = logging.getLogger(__name__)
+
+# Model sizes rarely change, so they're kept across runs in a small sqlite file
+# (under /tmp, the writable path on Lambda), fronted by an in-process cache.
+SIZE_CACHE_PATH = os.environ.get("SIZE_CACHE_PATH", "/tmp/size_cache.sqlite")
+SIZE_CACHE_TTL = 7 * 86400  # seconds
+_size_cache = TTLCache(maxsize=4096, ttl=SIZE_CACHE_TTL)
+
+# Ids the Hub reported as missing (typos, private repos), so a batch doesn't
+# pay a round trip per repeat; short TTL in case the repo is published later
+MISSING_MODEL_TTL = 3600  # seconds
+_missing_models = TTLCache(maxsize=10_000, ttl=MISSING_MODEL_TTL)
+
+# Memory budget per hardware target, in bytes; a model scores 1.0 at 0 bytes
+# falling linearly to 0.0 at the limit. Integers, so a score is one division
+# of the exact byte count.
+_HW_MAX_BYTES = (
+    ("raspberry_pi", 4 << 30),    # ~4GB RAM limit
+    ("jetson_nano", 8 << 30),     # ~8GB RAM limit
+    ("desktop_pc", 32 << 30),     # ~32GB RAM typical
+    ("aws_server", 100 << 30),    # ~100GB+ for cloud
+)
+
+# Shared read-only result for every resource that can't be sized; callers
+# must not mutate the scores mapping metric() returns
+_ZERO_SCORES: Mapping[str, float] = MappingProxyType(
+    dict.fromkeys((name for name, _ in _HW_MAX_BYTES), 0.0)
+)
+
+
+# Failures that mean "can't size this model" (not found, gated, bad id, network);
+# anything else is a bug and propagates
+_HUB_ERRORS = (HfHubHTTPError, HFValidationError, requests.RequestException)
+
+
+def _elapsed_ms(start_ns: int) -> int:
+    """Whole milliseconds since a time.monotonic_ns() reading."""
+    return (time.monotonic_ns() - start_ns) // 1_000_000
 
 
 def normalize(value: float, min_val: float, max_val: float) -> float:
@@ -43,109 +98,246 @@ def get_model_size_via_http(model_id: str, siblings: list) -> int:
     for filename in model_files[:3]:  # Limit to 3 requests
         try:
             url = f"https://huggingface.co/{model_id}/resolve/main/{filename}"
-            resp = requests.head(url, allow_redirects=True, timeout=5)
+            # Shared session: the HEADs below all go to huggingface.co, so later
+            # ones reuse the first one's connection
+            resp = SESSION.head(url, allow_redirects=True, timeout=5)
             if resp.status_code == 200:
                 content_length = resp.headers.get('Content-Length')
                 if content_length:
                     size = int(content_length)
-                    print(f"DEBUG SIZE: Got {filename} size={size} via HTTP HEAD")
+                    logger.debug("size: Got %s size=%s via HTTP HEAD", filename, size)
                     total_size += size
         except Exception as e:
-            print(f"DEBUG SIZE: HTTP HEAD failed for {filename}: {e}")
+            logger.debug("size: HTTP HEAD failed for %s: %s", filename, e)
             continue
     
     return total_size
 
 
-def metric(resource: dict[str, Any]) -> tuple[dict[str, float], int]:
+def _safetensors_total(model_id: str) -> int:
+    """safetensors.total from a Hub request that returns only that field."""
+    slim = _hub_model_info(model_id, expand=["safetensors"])
+    return getattr(getattr(slim, "safetensors", None), "total", 0) or 0
+
+
+def _fetch_model_size(model_id: str) -> int:
+    """Model size in bytes from the Hub, or 0 if the Hub doesn't report one."""
+    # Reuse the full record if another metric already fetched it; otherwise
+    # ask for just the safetensors field, a fraction of the full payload,
+    # and only fetch everything when the siblings fallback is needed.
+    info = hf_hub.model_info.cache.get((model_id,))
+    if info is None:
+        total = _safetensors_total(model_id)
+        if total:
+            logger.debug("size: Got size from safetensors: %s", total)
+            return total
+        info = model_info(model_id)
+    logger.debug("size: HuggingFace API call successful for '%s'", model_id)
+    
+    # Method 1: Try safetensors info
+    size_bytes = getattr(getattr(info, "safetensors", None), "total", 0) or 0
+    if size_bytes:
+        logger.debug("size: Got size from safetensors: %s", size_bytes)
+    
+    siblings = getattr(info, "siblings", None) or ()
+    
+    # Method 2: Try siblings with size
+    if size_bytes == 0 and siblings:
+        size_bytes = sum(getattr(s, "size", 0) or 0 for s in siblings)
+        if size_bytes > 0:
+            logger.debug("size: Got size from siblings: %s", size_bytes)
+    
+    # Method 3: Fallback to HTTP HEAD requests
+    if size_bytes == 0 and siblings:
+        logger.debug("size: Trying HTTP HEAD fallback")
+        size_bytes = get_model_size_via_http(model_id, siblings)
+    
+    return size_bytes
+
+
+def _disk_get(model_id: str) -> int | None:
+    """Size stored on disk within SIZE_CACHE_TTL, else None."""
+    try:
+        with closing(sqlite3.connect(SIZE_CACHE_PATH, timeout=5)) as conn:
+            row = conn.execute(
+                "SELECT size_bytes FROM model_size WHERE model_id = ? AND fetched_at > ?",
+                (model_id, time.time() - SIZE_CACHE_TTL),
+            ).fetchone()
+    except sqlite3.Error:
+        return None  # no table yet, or the cache file isn't usable
+    return row[0] if row else None
+
+
+def _disk_put(model_id: str, size_bytes: int) -> None:
+    try:
+        with closing(sqlite3.connect(SIZE_CACHE_PATH, timeout=5)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS model_size "
+                "(model_id TEXT PRIMARY KEY, size_bytes INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO model_size VALUES (?, ?, ?)",
+                (model_id, size_bytes, time.time()),
+            )
+    except sqlite3.Error as e:
+        logger.debug("size: could not write size cache: %s", e)
+
+
+def _cached_model_size(model_id: str) -> int:
+    """
+    Model size in bytes: memory, then the on-disk cache, then the Hub.
+
+    Only sizes the Hub actually reported are cached; a 0 is re-fetched next
+    time. Hub errors propagate to the caller, except that an id the Hub
+    recently reported missing is 0 without asking again.
+    """
+    size_bytes = _size_cache.get(model_id)
+    if size_bytes is None:
+        if model_id in _missing_models:
+            logger.debug("size: '%s' recently not found, skipping Hub", model_id)
+            return 0
+        size_bytes = _disk_get(model_id)
+        if size_bytes is None:
+            try:
+                size_bytes = _fetch_model_size(model_id)
+            except RepositoryNotFoundError:
+                _missing_models[model_id] = True
+                raise
+            if size_bytes:
+                _disk_put(model_id, size_bytes)
+        if size_bytes:
+            _size_cache[model_id] = size_bytes
+    return size_bytes
+
+
+def metric(resource: dict[str, Any]) -> tuple[Mapping[str, float], int]:
     """
     Model size metric - returns scores for different hardware types.
     Uses HuggingFace API to get actual model size.
     Falls back to HTTP HEAD requests if API doesn't have size info.
-    Returns (dict with 4 hardware scores, latency_ms)
+    Returns (mapping with 4 hardware scores, latency_ms); non-models and
+    models that can't be sized get a shared read-only all-zero mapping.
     
     Force deployment: 2025-12-10
     """
-    start = time.perf_counter()
-    
-    default_scores = {
-        "raspberry_pi": 0.0,
-        "jetson_nano": 0.0,
-        "desktop_pc": 0.0,
-        "aws_server": 0.0
-    }
-    
-    category = resource.get("category", "").upper()
-    if category != "MODEL":
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        return default_scores, latency_ms
-    
-    url = resource.get("url", "")
-    print(f"DEBUG SIZE: url='{url}', name='{resource.get('name', '')}'")
+    # Most resources in a batch aren't models; reject them before any work
+    if resource.get("category", "").upper() != "MODEL":
+        return _ZERO_SCORES, 0
+    return metric_ref(ResourceRef.from_dict(resource))
+
+
+def _ref_size_bytes(ref: ResourceRef) -> int:
+    """Size in bytes of a model ref; 0 if it has no HF id, no reported size, or the Hub fails."""
+    logger.debug("size: url='%s', name='%s'", ref.url, ref.name)
     
     # Only use URL to get model_id - NEVER use name field
-    model_id = None
-    if "huggingface.co" in url:
-        try:
-            # Extract from URL like https://huggingface.co/org/model
-            model_id = url.split("huggingface.co/")[-1].strip("/")
-            print(f"DEBUG SIZE: extracted model_id='{model_id}' from URL")
-        except Exception:
-            pass
-    
+    model_id = ref.hf_repo_id
     if not model_id:
-        # No valid HuggingFace URL - return zeros
-        print("DEBUG SIZE: No HuggingFace URL found, returning zeros")
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        return default_scores, latency_ms
+        logger.debug("size: No HuggingFace URL found")
+        return 0
     
     try:
-        info = model_info(model_id)
-        print(f"DEBUG SIZE: HuggingFace API call successful for '{model_id}'")
-        
-        size_bytes = 0
-        
-        # Method 1: Try safetensors info
-        if hasattr(info, 'safetensors') and info.safetensors:
-            if hasattr(info.safetensors, 'total'):
-                size_bytes = info.safetensors.total
-                print(f"DEBUG SIZE: Got size from safetensors: {size_bytes}")
-        
-        # Method 2: Try siblings with size
-        if size_bytes == 0 and hasattr(info, 'siblings') and info.siblings:
-            for sibling in info.siblings:
-                if hasattr(sibling, 'size') and sibling.size:
-                    size_bytes += sibling.size
-            if size_bytes > 0:
-                print(f"DEBUG SIZE: Got size from siblings: {size_bytes}")
-        
-        # Method 3: Fallback to HTTP HEAD requests
-        if size_bytes == 0 and hasattr(info, 'siblings') and info.siblings:
-            print("DEBUG SIZE: Trying HTTP HEAD fallback")
-            size_bytes = get_model_size_via_http(model_id, info.siblings)
-        
-        print(f"DEBUG SIZE: final size_bytes={size_bytes}")
-        
-        if size_bytes == 0:
-            # Model found but no size info even after fallback
-            print("DEBUG SIZE: Model found but no size info, returning zeros")
-            latency_ms = int((time.perf_counter() - start) * 1000)
-            return default_scores, latency_ms
-        
-        size_gb = size_bytes / (1024 ** 3)
-        
-        scores = {
-            "raspberry_pi": normalize(size_gb, 0.0, 4.0),    # ~4GB RAM limit
-            "jetson_nano": normalize(size_gb, 0.0, 8.0),     # ~8GB RAM limit
-            "desktop_pc": normalize(size_gb, 0.0, 32.0),     # ~32GB RAM typical
-            "aws_server": normalize(size_gb, 0.0, 100.0),    # ~100GB+ for cloud
-        }
-        
-        print(f"DEBUG SIZE: Returning scores={scores}")
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        return scores, latency_ms
-        
-    except (HfHubHTTPError, Exception) as e:
-        print(f"DEBUG SIZE: HuggingFace API failed for '{model_id}': {e}")
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        return default_scores, latency_ms
+        size_bytes = _cached_model_size(model_id)
+    except _HUB_ERRORS as e:
+        logger.debug("size: HuggingFace API failed for '%s': %s", model_id, e)
+        return 0
+    logger.debug("size: final size_bytes=%s", size_bytes)
+    return size_bytes
+
+
+def metric_ref(ref: ResourceRef) -> tuple[Mapping[str, float], int]:
+    """metric() for a ResourceRef; same scores and latency semantics."""
+    if ref.category != "MODEL":
+        return _ZERO_SCORES, 0
+
+    start_ns = time.monotonic_ns()
+    size_bytes = _ref_size_bytes(ref)
+    if not size_bytes:
+        logger.debug("size: no size info, returning zeros")
+        return _ZERO_SCORES, _elapsed_ms(start_ns)
+    
+    # normalize(size_gb, 0.0, limit_gb) without converting to GB first
+    scores = {
+        name: 0.0 if size_bytes >= max_bytes else 1.0 - size_bytes / max_bytes
+        for name, max_bytes in _HW_MAX_BYTES
+    }
+    
+    logger.debug("size: Returning scores=%s", scores)
+    latency_ms = _elapsed_ms(start_ns)
+    return scores, latency_ms
+
+
+def metric_batch(resources: list[dict[str, Any]], max_workers: int = 16) -> list[tuple[Mapping[str, float], int]]:
+    """
+    Score many resources concurrently; results are in input order.
+
+    The work is blocking Hub I/O, so threads overlap it. Keep `max_workers`
+    within the shared HTTP session's pool (see src.utils.http_session) so
+    each thread reuses a pooled connection instead of opening its own.
+    """
+    if not resources:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(resources))) as executor:
+        return list(executor.map(metric, resources))
+
+
+def metric_batch_scores(
+    resources: list[dict[str, Any]], max_workers: int = 16
+) -> tuple[dict[str, array], array]:
+    """
+    Columnar metric_batch: one float array per hardware target plus an array
+    of latencies, each in input order.
+
+    Sizes are resolved concurrently, then each column is filled in one pass,
+    so no per-resource score dict is built. Aggregations over a large batch
+    read contiguous doubles instead of boxed floats in dicts.
+    """
+    refs = [ResourceRef.from_dict(r) for r in resources]
+
+    def timed_size(ref: ResourceRef) -> tuple[int, int]:
+        if ref.category != "MODEL":
+            return 0, 0
+        start_ns = time.monotonic_ns()
+        size_bytes = _ref_size_bytes(ref)
+        return size_bytes, _elapsed_ms(start_ns)
+
+    if refs:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(refs))) as executor:
+            sized = list(executor.map(timed_size, refs))
+    else:
+        sized = []
+
+    sizes = [size_bytes for size_bytes, _ in sized]
+    columns = {
+        name: array("d", [
+            0.0 if not b or b >= max_bytes else 1.0 - b / max_bytes for b in sizes
+        ])
+        for name, max_bytes in _HW_MAX_BYTES
+    }
+    return columns, array("q", [latency for _, latency in sized])
+
+
+def metric_stream(in_path: str, out_path: str, concurrency: int = 16, chunk_size: int = 256) -> int:
+    """
+    Score a JSONL file of resources into a JSONL file of results; returns the
+    number of lines written.
+
+    Each output line is {"custom_id", "scores", "latency_ms"}, in input order,
+    where custom_id is the resource's name (or its URL if unnamed). Input is
+    read and scored `chunk_size` resources at a time, so memory stays flat on
+    a whole registry while each chunk's Hub lookups still run concurrently.
+    """
+    written = 0
+    with open(in_path, encoding="utf-8") as src, open(out_path, "w", encoding="utf-8") as dst:
+        lines = (line for line in src if line.strip())
+        while chunk := [json.loads(line) for line in islice(lines, chunk_size)]:
+            results = metric_batch(chunk, concurrency)
+            for resource, (scores, latency_ms) in zip(chunk, results, strict=True):
+                record = {
+                    "custom_id": resource.get("name") or resource.get("url"),
+                    "scores": dict(scores),
+                    "latency_ms": latency_ms,
+                }
+                dst.write(json.dumps(record) + "\n")
+            written += len(chunk)
+    return written
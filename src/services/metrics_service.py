@@ -9,11 +9,13 @@ import os
 import pkgutil
 import shutil
 import stat
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stderr, redirect_stdout
 
 from src.api.models import PackageRating, SizeScore
 from src.utils.logging import logger
+from src.utils.resource import normalize_resource
 
 # Re-using logic from run.py (adapted)
 
@@ -59,6 +61,13 @@ def load_metrics() -> dict[str, Callable]:
     print(f"DEBUG: Total metrics loaded: {list(metrics.keys())}")
     return metrics
 
+# Metric functions are synchronous and mostly waiting on HuggingFace/GitHub, so
+# one rating runs them side by side: wall clock ~ the slowest metric, not the sum.
+# Shared across ratings so concurrent requests can't multiply the thread count.
+_METRIC_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("METRIC_WORKERS", "16")), thread_name_prefix="metric"
+)
+
 # Version marker - change this to verify deployment
 CODE_VERSION = "2025-12-10-v3"
 
@@ -69,17 +78,17 @@ def compute_package_rating(url: str) -> PackageRating:
     from src.utils.github_link_finder import find_github_url_from_hf
     from src.utils.repo_cloner import clone_repo_to_temp
     
-    resource = {
+    resource = normalize_resource({
         "url": url,
         "category": classify_url(url),
         "name": "unknown" # TODO: extract name
-    }
+    })
     
-    # Extract name logic
-    if "github.com" in url:
-        resource["name"] = "/".join(url.rstrip("/").split("/")[-2:])
-    elif "huggingface.co" in url:
-         resource["name"] = url.split("huggingface.co/")[-1].rstrip("/")
+    # Extract name logic; metrics read the same parsed fields
+    if resource["kind"] == "github" and resource["owner"]:
+        resource["name"] = f"{resource['owner']}/{resource['repo']}"
+    elif resource["kind"] == "hf" and resource["hf_repo_id"]:
+        resource["name"] = resource["hf_repo_id"]
 
     repo_to_clone = None
     if "github.com" in url:
@@ -111,12 +120,13 @@ def compute_package_rating(url: str) -> PackageRating:
     metrics = load_metrics()
     results = {}
     
-    for name, metric_func in metrics.items():
+    futures = {name: _METRIC_EXECUTOR.submit(metric_func, resource) for name, metric_func in metrics.items()}
+    for name, future in futures.items():
         try:
             # Don't suppress stdout so we can see debug logging
-            score, latency = metric_func(resource)
+            score, latency = future.result()
             # Size metric returns a dict, not a float - handle specially
-            if name == "size" and isinstance(score, dict):
+            if name == "size" and isinstance(score, Mapping):
                 results[name] = (score, float(latency))
             else:
                 results[name] = (float(score), float(latency))
@@ -175,7 +185,7 @@ def compute_package_rating(url: str) -> PackageRating:
         for k, v in results.items():
             if k == "net_score":
                 continue
-            if k == "size" and isinstance(v[0], dict):
+            if k == "size" and isinstance(v[0], Mapping):
                 # Average the 4 size scores into one value
                 size_vals = list(v[0].values())
                 if size_vals:
@@ -257,10 +267,10 @@ def compute_package_rating(url: str) -> PackageRating:
         dataset_quality=get_res("dataset_quality")[0],
         dataset_quality_latency=get_res("dataset_quality")[1],
         size_score=SizeScore(
-            raspberry_pi=get_res("size")[0].get("raspberry_pi", 0.0) if isinstance(get_res("size")[0], dict) else 0.0,
-            jetson_nano=get_res("size")[0].get("jetson_nano", 0.0) if isinstance(get_res("size")[0], dict) else 0.0,
-            desktop_pc=get_res("size")[0].get("desktop_pc", 0.0) if isinstance(get_res("size")[0], dict) else 0.0,
-            aws_server=get_res("size")[0].get("aws_server", 0.0) if isinstance(get_res("size")[0], dict) else 0.0
+            raspberry_pi=get_res("size")[0].get("raspberry_pi", 0.0) if isinstance(get_res("size")[0], Mapping) else 0.0,
+            jetson_nano=get_res("size")[0].get("jetson_nano", 0.0) if isinstance(get_res("size")[0], Mapping) else 0.0,
+            desktop_pc=get_res("size")[0].get("desktop_pc", 0.0) if isinstance(get_res("size")[0], Mapping) else 0.0,
+            aws_server=get_res("size")[0].get("aws_server", 0.0) if isinstance(get_res("size")[0], Mapping) else 0.0
         ),
         size_score_latency=get_res("size")[1]
     )
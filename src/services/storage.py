@@ -4,11 +4,55 @@ Storage Service Module.
 Defines the interface and implementations for package retrieval and persistence.
 Supports multiple backends (LocalStorage, S3Storage, SQLiteStorage) and caching.
 """
+import base64
+import bisect
+import functools
 import os
+import queue
 import re
 import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby, islice
+from operator import itemgetter
+from urllib.parse import quote, unquote
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from src.api.models import Package, PackageMetadata, PackageQuery
+from src.utils.cache import TTLCache
+from src.utils.trigram import compile_search, required_trigrams, trigrams
+
+
+def _name_keys(name: str | None) -> set[str]:
+    """Lookup keys for find_by_name: the lowercased name and its part after the last '/'."""
+    if not name:
+        return set()
+    lower = name.lower()
+    return {lower, lower.rsplit("/", 1)[-1]}
+
+
+def _query_matches(q: PackageQuery, meta: PackageMetadata) -> bool:
+    # Name match (exact or wildcard)
+    if q.name != "*" and q.name != meta.name:
+        return False
+    # Version match (exact for now)
+    if q.version and q.version != meta.version:
+        return False
+    # Type match
+    # q.types is list[str] e.g. ["code", "model"]
+    # meta.type is str e.g. "code"
+    return not q.types or meta.type in [t.lower() for t in q.types]
+
+
+def _package_trigrams(package: Package) -> set[str]:
+    """Trigrams regex search can match in: the name's and the readme's."""
+    return trigrams(package.metadata.name) | trigrams(package.data.readme)
 
 
 class LocalStorage:
@@ -16,70 +60,122 @@ class LocalStorage:
         print("DEBUG: Initializing LocalStorage (In-Memory)")
         # In-memory storage: {package_id: Package}
         self.packages: dict[str, Package] = {}
+        # Name lookup key -> ids carrying it, oldest first
+        self._name_index: dict[str, list[str]] = {}
+        # Trigram of name/readme -> ids containing it, to prefilter regex search
+        self._trigram_index: dict[str, set[str]] = {}
+        # Every id, sorted, so list_packages can seek to a cursor
+        self._sorted_ids: list[str] = []
+        # Bumped on every mutation so callers can cache derived views
+        self.version = 0
+
+    def _index_remove(self, package: Package) -> None:
+        for key in _name_keys(package.metadata.name):
+            ids = self._name_index.get(key)
+            if ids and package.metadata.id in ids:
+                ids.remove(package.metadata.id)
+                if not ids:
+                    del self._name_index[key]
+        for tri in _package_trigrams(package):
+            ids = self._trigram_index.get(tri)
+            if ids is not None:
+                ids.discard(package.metadata.id)
+                if not ids:
+                    del self._trigram_index[tri]
+
+    def _put(self, package: Package) -> None:
+        self.version += 1
+        old = self.packages.get(package.metadata.id)
+        if old is not None:
+            self._index_remove(old)
+        else:
+            bisect.insort(self._sorted_ids, package.metadata.id)
+        self.packages[package.metadata.id] = package
+        for key in _name_keys(package.metadata.name):
+            self._name_index.setdefault(key, []).append(package.metadata.id)
+        for tri in _package_trigrams(package):
+            self._trigram_index.setdefault(tri, set()).add(package.metadata.id)
 
     def add_package(self, package: Package) -> None:
         print(f"DEBUG: LocalStorage add_package {package.metadata.id}")
-        self.packages[package.metadata.id] = package
+        self._put(package)
+
+    def bulk_add_packages(self, packages: Iterable[Package]) -> None:
+        for package in packages:
+            self._put(package)
 
     def get_package(self, package_id: str) -> Package | None:
         return self.packages.get(package_id)
 
-    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10) -> list[PackageMetadata]:
+    def exists(self, package_id: str) -> bool:
+        return package_id in self.packages
+
+    def get_package_content(self, package_id: str) -> str | None:
+        pkg = self.packages.get(package_id)
+        return None if pkg is None else pkg.data.content or ""
+
+    def find_by_name(self, name: str) -> PackageMetadata | None:
+        """Case-insensitive lookup by full name or by the part after the last '/'."""
+        ids = self._name_index.get(name.lower())
+        return self.packages[ids[-1]].metadata if ids else None
+
+    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10,
+                      cursor: str | None = None) -> list[PackageMetadata]:
+        """
+        Packages in id order, as every backend pages them.
+
+        `cursor` resumes right after that id, whether or not the package
+        still exists, by bisecting the sorted id list.
+        """
         print(f"DEBUG: LocalStorage list_packages queries={queries} offset={offset} limit={limit}")
-        all_packages = list(self.packages.values())
-        
+        start = 0 if cursor is None else bisect.bisect_right(self._sorted_ids, cursor)
+        all_packages = (self.packages[self._sorted_ids[i]] for i in range(start, len(self._sorted_ids)))
+
         # Filter
         if not queries:
              filtered = all_packages
         else:
-            filtered = []
-            for pkg in all_packages:
-                match = False
-                for q in queries:
-                    # Name match (exact or wildcard)
-                    if q.name != "*" and q.name != pkg.metadata.name:
-                        continue
-                    
-                    # Version match (exact for now)
-                    if q.version and q.version != pkg.metadata.version:
-                        continue
-                        
-                    # Type match
-                    # q.types is list[str] e.g. ["code", "model"]
-                    # pkg.metadata.type is str e.g. "code"
-                    if q.types and pkg.metadata.type not in [t.lower() for t in q.types]:
-                        continue
-                        
-                    match = True
-                    break
-                if match:
-                    filtered.append(pkg)
-        
-        # Pagination logic
-        return [p.metadata for p in filtered[offset:offset+limit]]
+            filtered = (pkg for pkg in all_packages if any(_query_matches(q, pkg.metadata) for q in queries))
+
+        # Pagination logic; stops reading once the page is full
+        return [p.metadata for p in islice(filtered, offset, offset + limit)]
 
     def delete_package(self, package_id: str) -> bool:
         print(f"DEBUG: LocalStorage delete_package {package_id}")
         if package_id in self.packages:
-            del self.packages[package_id]
+            self._index_remove(self.packages.pop(package_id))
+            del self._sorted_ids[bisect.bisect_left(self._sorted_ids, package_id)]
+            self.version += 1
             return True
         return False
 
     def reset(self) -> None:
         print("DEBUG: LocalStorage reset called")
         self.packages.clear()
+        self._name_index.clear()
+        self._trigram_index.clear()
+        self._sorted_ids.clear()
+        self.version += 1
 
     def search_by_regex(self, regex: str) -> list[PackageMetadata]:
         try:
-            pattern = re.compile(regex, re.IGNORECASE)  # Case insensitive
+            search = compile_search(regex)  # Case insensitive
+            required = required_trigrams(regex)
         except re.error:
             return []
         
+        packages = self.packages.values()
+        if required:
+            # Only packages holding every required trigram can match
+            postings = sorted((self._trigram_index.get(t, set()) for t in required), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            packages = [pkg for pid, pkg in self.packages.items() if pid in candidates]
+
         matches = []
-        for pkg in self.packages.values():
+        for pkg in packages:
             # Search in name and readme
-            name_match = pattern.search(pkg.metadata.name) if pkg.metadata.name else False
-            readme_match = pattern.search(pkg.data.readme) if pkg.data.readme else False
+            name_match = search(pkg.metadata.name) if pkg.metadata.name else False
+            readme_match = search(pkg.data.readme) if pkg.data.readme else False
             if name_match or readme_match:
                 matches.append(pkg.metadata)
         return matches
@@ -87,13 +183,30 @@ class LocalStorage:
     def get_download_url(self, id: str) -> str | None:
         return None
 
+# Connections per S3 client; bulk and scan paths run this many requests at once
+_S3_MAX_POOL = 64
+
+
+@functools.cache
+def _s3_client(region: str):
+    """One shared, thread-safe S3 client per region, so its config and pool are built once."""
+    return boto3.client('s3', region_name=region, config=Config(
+        max_pool_connections=_S3_MAX_POOL,
+        retries={'max_attempts': 3, 'mode': 'adaptive'},
+        tcp_keepalive=True,
+    ))
+
+
 class S3Storage:
     def __init__(self, bucket_name: str, region: str):
-
-        import boto3
         self.bucket = bucket_name
-        self.s3 = boto3.client('s3', region_name=region)
+        self.s3 = _s3_client(region)
         self.prefix = "packages/"
+        # Counts writes made through this instance only
+        self.version = 0
+
+    # Empty objects under "<id>/index/" whose key is name/version/type
+    _INDEX_DIR = "index/"
 
     def _get_key(self, package_id: str, kind: str = "metadata") -> str:
         # kind: metadata | content | full
@@ -108,7 +221,12 @@ class S3Storage:
 
     def add_package(self, package: Package) -> None:
         print(f"DEBUG: S3 add_package {package.metadata.id}")
+        self.version += 1
         try:
+            try:
+                previous = self._get_metadata(package.metadata.id)
+            except ValueError:
+                previous = None  # unreadable; list_packages falls back to GETs
             # Store metadata
             self.s3.put_object(
                 Bucket=self.bucket,
@@ -117,7 +235,6 @@ class S3Storage:
             )
             # Store content if exists
             if package.data.content:
-                import base64
                 binary_data = base64.b64decode(package.data.content)
                 self.s3.put_object(
                     Bucket=self.bucket,
@@ -137,15 +254,61 @@ class S3Storage:
                 Key=self._get_key(package.metadata.id, "full"),
                 Body=package.model_dump_json()
             )
+            self._put_index_marker(package.metadata, previous)
         except Exception as e:
             print(f"DEBUG: S3 add_package error: {e}")
             raise e
 
+    def _index_key(self, meta: PackageMetadata) -> str:
+        fields = (quote(v, safe="") for v in (meta.name, meta.version, meta.type))
+        return f"{self.prefix}{meta.id}/{self._INDEX_DIR}{'/'.join(fields)}"
+
+    def _put_index_marker(self, meta: PackageMetadata, previous: PackageMetadata | None) -> None:
+        """
+        Write the package's filterable fields into an empty object's key.
+
+        list_packages reads them straight out of the bucket listing, so it
+        needs no GET per package. The marker of the `previous` metadata
+        stored under the same id is removed if its fields changed.
+        """
+        key = self._index_key(meta)
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=b"")
+        if previous is not None and self._index_key(previous) != key:
+            self.s3.delete_object(Bucket=self.bucket, Key=self._index_key(previous))
+
+    def _meta_from_index(self, package_id: str, names: set[str]) -> PackageMetadata | None:
+        """Metadata from the package's single index marker, if it has one."""
+        markers = [n for n in names if n.startswith(self._INDEX_DIR)]
+        if len(markers) != 1:
+            return None  # written before markers existed, or mid-update
+        fields = markers[0][len(self._INDEX_DIR):].split("/")
+        if len(fields) != 3:
+            return None
+        name, version, kind = (unquote(f) for f in fields)
+        return PackageMetadata(id=package_id, name=name, version=version, type=kind)
+
+    # Within the client's connection pool, so no thread queues for a connection
+    _BULK_WORKERS = 32
+
+    def bulk_add_packages(self, packages: Iterable[Package]) -> None:
+        """
+        S3 has no multi-object PUT, so overlap the per-package PUTs instead.
+
+        The boto3 client is thread-safe and pools its connections, so
+        add_package runs concurrently; the first failure is re-raised.
+        """
+        with ThreadPoolExecutor(max_workers=self._BULK_WORKERS) as executor:
+            for _ in executor.map(self.add_package, packages):
+                pass
+
+    def _full_keys(self, package_id: str) -> tuple[str, str]:
+        """Where the full package may live: the standard key, then the legacy .zip one."""
+        return self._get_key(package_id, "full"), f"{self.prefix}{package_id}/full.zip"
+
     def get_package(self, package_id: str) -> Package | None:
-        from botocore.exceptions import ClientError
+        key, fallback_key = self._full_keys(package_id)
         try:
             # Try standard key
-            key = self._get_key(package_id, "full")
             response = self.s3.get_object(Bucket=self.bucket, Key=key)
             content = response['Body'].read().decode('utf-8')
             return Package.model_validate_json(content)
@@ -153,7 +316,6 @@ class S3Storage:
             print(f"DEBUG: S3 get_package error for {package_id} (key={key}): {e}")
             # Fallback: try with .zip extension if it was saved that way previously
             try:
-                fallback_key = f"{self.prefix}{package_id}/full.zip"
                 response = self.s3.get_object(Bucket=self.bucket, Key=fallback_key)
                 content = response['Body'].read().decode('utf-8')
                 return Package.model_validate_json(content)
@@ -161,10 +323,64 @@ class S3Storage:
                 pass
             return None
 
-    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10) -> list[PackageMetadata]:
-        print(f"DEBUG: S3 list_packages queries={queries} offset={offset} limit={limit}")
+    def get_package_content(self, package_id: str) -> str | None:
+        pkg = self.get_package(package_id)
+        return None if pkg is None else pkg.data.content or ""
+
+    def find_by_name(self, name: str) -> PackageMetadata | None:
+        # No name index in S3; fall back to scanning package metadata
+        key = name.lower()
+        found = None
+        for meta in self.list_packages([], 0, 1000):
+            if key in _name_keys(meta.name):
+                found = meta
+        return found
+
+    def exists(self, package_id: str) -> bool:
+        """HEAD the full-package object instead of downloading it, checking the same keys get_package reads."""
+        for key in self._full_keys(package_id):
+            try:
+                self.s3.head_object(Bucket=self.bucket, Key=key)
+                return True
+            except ClientError:
+                continue
+        return False
+
+    def _iter_packages(self, **list_kwargs) -> Iterator[tuple[str, set[str]]]:
+        """
+        (package id, object names under it) for every package, in key order.
+
+        Lists without a delimiter, so S3 returns up to 1000 keys per request
+        instead of one common prefix per package. Keys come back sorted, so a
+        package's objects are adjacent even across page boundaries.
+        """
         paginator = self.s3.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter='/')
+        pages = paginator.paginate(
+            Bucket=self.bucket, Prefix=self.prefix, PaginationConfig={'PageSize': 1000}, **list_kwargs
+        )
+        keys = (obj['Key'][len(self.prefix):] for page in pages for obj in page.get('Contents', []))
+        for pkg_id, group in groupby((key.partition('/') for key in keys), key=itemgetter(0)):
+            names = {name for _, sep, name in group if sep}
+            if names:
+                yield pkg_id, names
+
+    def _get_metadata(self, package_id: str) -> PackageMetadata | None:
+        """The small metadata object, without the full package and its content."""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self._get_key(package_id, "metadata"))
+            return PackageMetadata.model_validate_json(response['Body'].read())
+        except ClientError:
+            return None
+
+    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10,
+                      cursor: str | None = None) -> list[PackageMetadata]:
+        print(f"DEBUG: S3 list_packages queries={queries} offset={offset} limit={limit}")
+        kwargs = {}
+        if cursor is not None:
+            # Have S3 skip everything up to and including the cursor's prefix:
+            # '0' is the character right after '/', so it sorts after every
+            # key under "<cursor>/" and before the next package's prefix
+            kwargs["StartAfter"] = f"{self.prefix}{cursor}0"
         
         # In S3, we can't easily filter without reading metadata. 
         # For this scale, we list all and filter in memory (inefficient but works for small scale).
@@ -176,45 +392,47 @@ class S3Storage:
         count = 0
         skipped = 0
         
-        for page in pages:
-            for prefix in page.get('CommonPrefixes', []):
-                pkg_id = prefix.get('Prefix').split('/')[-2]
+        for pkg_id, keys in self._iter_packages(**kwargs):
+            meta = self._meta_from_index(pkg_id, keys)
+            if meta is None and "metadata.json" in keys:
+                meta = self._get_metadata(pkg_id)
+            if meta is None:
                 pkg = self.get_package(pkg_id)
                 if not pkg:
                     continue
-                
-                # Apply Filter
-                match = False
-                if not queries:
+                meta = pkg.metadata
+            
+            # Apply Filter
+            match = False
+            if not queries:
+                match = True
+            else:
+                for q in queries:
+                    if q.name != "*" and q.name != meta.name:
+                        continue
+                    if q.version and q.version != meta.version:
+                        continue
+                    if q.types and meta.type not in [t.lower() for t in q.types]:
+                        continue
                     match = True
-                else:
-                    for q in queries:
-                        if q.name != "*" and q.name != pkg.metadata.name:
-                            continue
-                        if q.version and q.version != pkg.metadata.version:
-                            continue
-                        if q.types and pkg.metadata.type not in [t.lower() for t in q.types]:
-                            continue
-                        match = True
-                        break
+                    break
+            
+            if match:
+                if skipped < offset:
+                    skipped += 1
+                    continue
                 
-                if match:
-                    if skipped < offset:
-                        skipped += 1
-                        continue
-                    
-                    packages.append(pkg.metadata)
-                    count += 1
-                    if count >= limit:
-                        break
-            if count >= limit:
-                break
+                packages.append(meta)
+                count += 1
+                if count >= limit:
+                    break
         
         print(f"DEBUG: S3 list_packages found {len(packages)} packages")
         return packages
 
     def delete_package(self, package_id: str) -> bool:
         print(f"DEBUG: S3 delete_package {package_id}")
+        self.version += 1
         objects = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=f"{self.prefix}{package_id}/")
         if 'Contents' in objects:
             delete_keys = [{'Key': obj['Key']} for obj in objects['Contents']]
@@ -224,6 +442,7 @@ class S3Storage:
 
     def reset(self) -> None:
         print("DEBUG: S3 reset called")
+        self.version += 1
         # Delete everything in bucket under prefix
         objects = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=self.prefix)
         if 'Contents' in objects:
@@ -258,7 +477,7 @@ class S3Storage:
             return []
         
         try:
-            pattern = re.compile(regex, re.IGNORECASE)  # Case insensitive
+            search = compile_search(regex)  # Case insensitive
         except re.error:
             print("DEBUG: S3 regex invalid pattern, returning []")
             return []
@@ -269,47 +488,42 @@ class S3Storage:
         MAX_TOTAL_TIME = 20  # 20 second total
         
         try:
-            paginator = self.s3.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter='/')
-            
-            for page in pages:
-                for prefix in page.get('CommonPrefixes', []):
-                    # Check total time limit
-                    elapsed = time.time() - start_time
-                    if elapsed > MAX_TOTAL_TIME:
-                        print(f"DEBUG: S3 regex total timeout ({elapsed:.1f}s), returning []")
-                        return []
-                        
-                    pkg_id = prefix.get('Prefix').split('/')[-2]
-                    pkg = self.get_package(pkg_id)
-                    if not pkg:
-                        continue
+            for pkg_id, _ in self._iter_packages():
+                # Check total time limit
+                elapsed = time.time() - start_time
+                if elapsed > MAX_TOTAL_TIME:
+                    print(f"DEBUG: S3 regex total timeout ({elapsed:.1f}s), returning []")
+                    return []
                     
-                    # Quick check with time limit per artifact
-                    match_start = time.time()
-                    name_match = False
-                    readme_match = False
+                pkg = self.get_package(pkg_id)
+                if not pkg:
+                    continue
+                
+                # Quick check with time limit per artifact
+                match_start = time.time()
+                name_match = False
+                readme_match = False
+                
+                try:
+                    if pkg.metadata.name:
+                        name_match = bool(search(pkg.metadata.name))
                     
-                    try:
-                        if pkg.metadata.name:
-                            name_match = bool(pattern.search(pkg.metadata.name))
-                        
-                        # Check time before readme (readme is longer)
-                        if time.time() - match_start > MAX_TIME_PER_MATCH:
-                            print(f"DEBUG: Regex timeout on name for {pkg.metadata.name}")
-                            continue
-                            
-                        if pkg.data.readme:
-                            readme_match = bool(pattern.search(pkg.data.readme))
-                    except Exception as match_err:
-                        print(f"DEBUG: Regex match error: {match_err}")
+                    # Check time before readme (readme is longer)
+                    if time.time() - match_start > MAX_TIME_PER_MATCH:
+                        print(f"DEBUG: Regex timeout on name for {pkg.metadata.name}")
                         continue
-                    
-                    print(f"DEBUG: S3 regex check: name={pkg.metadata.name}, name_match={name_match}, readme_len={len(pkg.data.readme or '')}, readme_match={readme_match}")
-                    
-                    if name_match or readme_match:
-                        matches.append(pkg.metadata)
                         
+                    if pkg.data.readme:
+                        readme_match = bool(search(pkg.data.readme))
+                except Exception as match_err:
+                    print(f"DEBUG: Regex match error: {match_err}")
+                    continue
+                
+                print(f"DEBUG: S3 regex check: name={pkg.metadata.name}, name_match={name_match}, readme_len={len(pkg.data.readme or '')}, readme_match={readme_match}")
+                
+                if name_match or readme_match:
+                    matches.append(pkg.metadata)
+                    
         except Exception as e:
             print(f"DEBUG: S3 search_by_regex error: {e}, returning []")
             return []
@@ -321,9 +535,8 @@ class S3Storage:
         """Generate a download URL for the package per spec."""
         print(f"DEBUG: S3 get_download_url for {package_id}")
         try:
-            # First check if the package exists
-            pkg = self.get_package(package_id)
-            if not pkg:
+            # First check if the package exists; a HEAD, not the full package
+            if not self.exists(package_id):
                 print("DEBUG: S3 get_download_url - package not found")
                 return None
             
@@ -339,7 +552,8 @@ class S3Storage:
                 return url
             except Exception:
                 # If content.zip doesn't exist, return original URL
-                if pkg.data.url:
+                pkg = self.get_package(package_id)
+                if pkg and pkg.data.url:
                     print(f"DEBUG: S3 get_download_url - using original URL: {pkg.data.url}")
                     return pkg.data.url
                 return None
@@ -375,6 +589,15 @@ class S3Storage:
             print(f"DEBUG: S3 get_rating not found for {package_id}: {e}")
             return None
 
+    def delete_rating(self, package_id: str) -> bool:
+        """Drop the persisted rating so the next read recomputes it."""
+        try:
+            self.s3.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{package_id}/rating.json")
+            return True
+        except Exception as e:
+            print(f"DEBUG: S3 delete_rating error: {e}")
+            return False
+
 
 
 
@@ -386,14 +609,59 @@ class SQLiteStorage:
     Persists package metadata and content as JSON blobs in a single-file database.
     Optimized for search performance using SQL indexing.
     """
-    def __init__(self, db_path="registry.db"):
+    def __init__(self, db_path="registry.db", read_pool_size: int | None = None):
         print(f"DEBUG: Initializing SQLiteStorage at {db_path}")
         self.db_path = db_path
         self.bucket = "local-sqlite" # dummy for compatibility
+        self.version = 0  # bumped on every write through this instance
+        # One writer + N readers. WAL lets the readers run alongside the writer,
+        # and keeping the connections open avoids re-opening db/-wal/-shm per call.
+        self._write_pool: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=1)
+        self._write_pool.put(self._connect())
         self._init_db()
+        pool_size = read_pool_size or os.cpu_count() or 4
+        self._read_pool: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._read_pool.put(self._connect())
+
+    # Applied to every connection we open. journal_mode=WAL is persistent in the
+    # db file, the rest are per-connection. Deliberately no cache=shared.
+    # mmap_size lets reads come straight from the OS page cache instead of
+    # being copied into SQLite's own buffers.
+    _PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA temp_store=memory",
+        "PRAGMA mmap_size=268435456",  # 256 MiB
+    )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in self._PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        conn = self._write_pool.get()
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            self._write_pool.put(conn)
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._writer() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS packages (
                     id TEXT PRIMARY KEY,
@@ -404,94 +672,190 @@ class SQLiteStorage:
                     readme TEXT
                 )
             """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_name_lower ON packages (lower(name))")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_name_version ON packages (name, version)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_type ON packages (type)")
+            # Trigram postings for search_by_regex (see src.utils.trigram)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trigrams (
+                    tri TEXT,
+                    pkg_id TEXT,
+                    PRIMARY KEY (tri, pkg_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_trigrams_pkg ON trigrams (pkg_id)")
+            # Databases written before the trigram table existed get it backfilled once
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                for pid, name, readme in conn.execute("SELECT id, name, readme FROM packages").fetchall():
+                    self._index_trigrams(conn, pid, name, readme)
+                conn.execute("PRAGMA user_version = 1")
+
+    @staticmethod
+    def _index_trigrams(conn: sqlite3.Connection, package_id: str, name: str | None, readme: str | None) -> None:
+        conn.execute("DELETE FROM trigrams WHERE pkg_id = ?", (package_id,))
+        conn.executemany(
+            "INSERT INTO trigrams (tri, pkg_id) VALUES (?, ?)",
+            ((tri, package_id) for tri in trigrams(name) | trigrams(readme))
+        )
 
     def _get_pkg_from_row(self, row):
         if not row:
             return None
         return Package.model_validate_json(row[0])
 
+    _INSERT_SQL = "INSERT OR REPLACE INTO packages (id, name, version, type, full_json, readme) VALUES (?, ?, ?, ?, ?, ?)"
+
+    def _write_package(self, conn: sqlite3.Connection, package: Package) -> None:
+        meta = package.metadata
+        conn.execute(
+            self._INSERT_SQL,
+            (meta.id, meta.name, meta.version, meta.type, package.model_dump_json(), package.data.readme)
+        )
+        self._index_trigrams(conn, meta.id, meta.name, package.data.readme)
+
     def add_package(self, package: Package) -> None:
         print(f"DEBUG: SQLite add_package {package.metadata.id}")
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO packages (id, name, version, type, full_json, readme) VALUES (?, ?, ?, ?, ?, ?)",
-                (package.metadata.id, package.metadata.name, package.metadata.version, 
-                 package.metadata.type, package.model_dump_json(), package.data.readme)
-            )
+        self.version += 1
+        with self._writer() as conn:
+            self._write_package(conn, package)
+
+    def bulk_add_packages(self, packages: Iterable[Package]) -> None:
+        """
+        Insert many packages in a single transaction.
+
+        Packages are consumed lazily and each is written (row plus trigram
+        postings) as it arrives, using the connection's cached prepared
+        statements, so memory stays flat for large counts.
+        """
+        self.version += 1
+        with self._writer() as conn:
+            # Take the write lock up front so we never hit SQLITE_BUSY mid-batch
+            conn.execute("BEGIN IMMEDIATE")
+            for package in packages:
+                self._write_package(conn, package)
 
     def get_package(self, package_id: str) -> Package | None:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cur = conn.execute("SELECT full_json FROM packages WHERE id = ?", (package_id,))
             return self._get_pkg_from_row(cur.fetchone())
 
-    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10) -> list[PackageMetadata]:
+    def get_package_content(self, package_id: str) -> str | None:
+        """
+        Fast path for readers that only need the content blob.
+
+        Pulls data.content out in SQL and skips Pydantic validation of the
+        whole row. Returns None if the package does not exist.
+        """
+        with self._reader() as conn:
+            row = conn.execute(
+                "SELECT json_extract(full_json, '$.data.content') FROM packages WHERE id = ?",
+                (package_id,)
+            ).fetchone()
+        return None if row is None else row[0] or ""
+
+    def find_by_name(self, name: str) -> PackageMetadata | None:
+        """Case-insensitive lookup by full name or by the part after the last '/'."""
+        key = name.lower()
+        # Escape LIKE wildcards so they match literally
+        suffix = "%/" + key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._reader() as conn:
+            row = conn.execute(
+                """
+                SELECT id, name, version, type FROM packages
+                WHERE lower(name) = ? OR lower(name) LIKE ? ESCAPE '\\'
+                ORDER BY lower(name) = ? DESC, rowid DESC LIMIT 1
+                """,
+                (key, suffix, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return PackageMetadata(id=row[0], name=row[1], version=row[2], type=row[3])
+
+    def exists(self, package_id: str) -> bool:
+        # Primary-key probe only; never touches the full_json blob
+        with self._reader() as conn:
+            cur = conn.execute("SELECT 1 FROM packages WHERE id = ? LIMIT 1", (package_id,))
+            return cur.fetchone() is not None
+
+    def list_packages(self, queries: list[PackageQuery] | None = None, offset: int = 0, limit: int = 10,
+                      cursor: str | None = None) -> list[PackageMetadata]:
+        """
+        Same matching as LocalStorage.list_packages, done in SQL.
+
+        Each query becomes an AND of its name/version/type conditions and the
+        queries are OR-ed, so the indexes pick the rows and only one page of
+        metadata columns is read back; full_json is never parsed.
+
+        Rows come back in id order, like the other backends. `cursor` is the
+        id of the last package on the previous page; the page starts right
+        after it via the primary key, even if that package has since been
+        deleted, so deep pages cost the same as the first.
+        """
         print(f"DEBUG: SQLite list_packages queries={queries}")
-        # Fetch all metadata fields to filter in python (simplest for compatibility)
-        # OR optimize with SQL if queries are simple
-        
-        with sqlite3.connect(self.db_path) as conn:
-            # Check total count first if needed, but let's just fetch
-            cur = conn.execute("SELECT full_json FROM packages")
-            all_rows = cur.fetchall()
-            
-        all_pkgs = [self._get_pkg_from_row(r) for r in all_rows]
-        
-        # Reuse filtering logic (or copy-paste minimal)
-        # To avoid code duplication, we could have a shared filter helper.
-        # But per instructions "simplest way", I'll copy the filter loop from LocalStorage/S3.
-        
-        filtered = []
-        if not queries:
-            filtered = all_pkgs
-        else:
-            for pkg in all_pkgs:
-                if not pkg:
-                    continue
-                match = False
-                for q in queries:
-                    if q.name != "*" and q.name != pkg.metadata.name:
-                        continue
-                    if q.version and q.version != pkg.metadata.version:
-                        continue
-                    if q.types and pkg.metadata.type not in [t.lower() for t in q.types]:
-                        continue
-                    match = True
-                    break
-                if match:
-                    filtered.append(pkg)
-                    
-        return [p.metadata for p in filtered[offset:offset+limit]]
+        where, params = [], []
+        for q in queries or ():
+            conds = []
+            if q.name != "*":
+                conds.append("name = ?")
+                params.append(q.name)
+            if q.version:
+                conds.append("version = ?")
+                params.append(q.version)
+            if q.types:
+                conds.append(f"type IN ({','.join('?' * len(q.types))})")
+                params.extend(t.lower() for t in q.types)
+            where.append(" AND ".join(conds) or "1")
+
+        match = " OR ".join(f"({w})" for w in where) or "1"
+        if cursor is not None:
+            # Keyset seek past the cursor instead of counting off rows
+            match = f"id > ? AND ({match})"
+            params.insert(0, cursor)
+        sql = f"SELECT id, name, version, type FROM packages WHERE {match}"
+        sql += " ORDER BY id LIMIT ? OFFSET ?"
+        with self._reader() as conn:
+            rows = conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [PackageMetadata(id=r[0], name=r[1], version=r[2], type=r[3]) for r in rows]
 
     def delete_package(self, package_id: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        self.version += 1
+        with self._writer() as conn:
             cur = conn.execute("DELETE FROM packages WHERE id = ?", (package_id,))
+            conn.execute("DELETE FROM trigrams WHERE pkg_id = ?", (package_id,))
             return cur.rowcount > 0
 
     def reset(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        self.version += 1
+        with self._writer() as conn:
             conn.execute("DELETE FROM packages")
+            conn.execute("DELETE FROM trigrams")
 
     def search_by_regex(self, regex: str) -> list[PackageMetadata]:
         print(f"DEBUG: search_by_regex {regex}")
         try:
-            pattern = re.compile(regex, re.IGNORECASE)  # Case insensitive
+            search = compile_search(regex)  # Case insensitive
+            required = sorted(required_trigrams(regex))
         except re.error:
             return []
-            
+
+        sql = "SELECT id, name, version, type, readme FROM packages"
+        if required:
+            # Only packages holding every required trigram can match
+            sql += f"""
+                WHERE id IN (
+                    SELECT pkg_id FROM trigrams WHERE tri IN ({','.join('?' * len(required))})
+                    GROUP BY pkg_id HAVING COUNT(*) = ?
+                )"""
+        sql += " ORDER BY rowid"
+        params = (*required, len(required)) if required else ()
+
         matches = []
-        with sqlite3.connect(self.db_path) as conn:
-            # Iterate and match
-            cur = conn.execute("SELECT full_json FROM packages")
-            for row in cur:
-                pkg = self._get_pkg_from_row(row)
-                if not pkg:
-                    continue
-                
-                name_match = pattern.search(pkg.metadata.name) if pkg.metadata.name else False
-                readme_match = pattern.search(pkg.data.readme) if pkg.data.readme else False
-                
+        with self._reader() as conn:
+            for pid, name, version, kind, readme in conn.execute(sql, params):
+                name_match = search(name) if name else False
+                readme_match = search(readme) if readme else False
                 if name_match or readme_match:
-                    matches.append(pkg.metadata)
+                    matches.append(PackageMetadata(id=pid, name=name, version=version, type=kind))
         return matches
 
     def get_download_url(self, package_id: str) -> str | None:
@@ -510,34 +874,126 @@ class CachedStorage:
     In-memory LRU Cache decorator for Storage implementations.
     
     Significantly improves read latency for frequently accessed packages by key.
+    Entries are split across a few shards, each with its own lock, so concurrent
+    readers hitting different ids don't contend on one global lock. Total size
+    is bounded by CACHE_SIZE (default 4096).
+
+    Ids the backend doesn't have are remembered for NEGATIVE_CACHE_TTL seconds
+    so repeated lookups of a missing id don't each reach S3/SQLite, and
+    concurrent misses on one id share a single backend fetch.
     """
-    def __init__(self, wrapped):
+    _SHARDS = 8  # power of two so the shard index is a mask
+    NEGATIVE_CACHE_TTL = 30  # seconds; bounds staleness for writes made elsewhere
+
+    def __init__(self, wrapped, maxsize: int | None = None):
         print("DEBUG: Initializing CachedStorage Wrapper")
         self.wrapped = wrapped
-        self._cache = {} # id -> Package
+        if maxsize is None:
+            maxsize = int(os.environ.get("CACHE_SIZE", "4096"))
+        self._shard_size = max(1, maxsize // self._SHARDS)
+        self._shards: list[OrderedDict[str, Package]] = [OrderedDict() for _ in range(self._SHARDS)]
+        self._locks = [threading.Lock() for _ in range(self._SHARDS)]
+        self._missing = TTLCache(maxsize=maxsize, ttl=self.NEGATIVE_CACHE_TTL)
+        # id -> event set when the in-flight backend fetch for it finishes
+        self._inflight: dict[str, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+        # Bumped on every write so a fetch that raced one doesn't record a stale miss
+        self._writes = 0
 
-    def get_package(self, package_id: str):
-        if package_id in self._cache:
-            #print(f"DEBUG: Cache HIT {package_id}")
-            return self._cache[package_id]
-        #print(f"DEBUG: Cache MISS {package_id}")
+    def _shard(self, package_id: str) -> int:
+        return hash(package_id) & (self._SHARDS - 1)
+
+    def _cache_get(self, package_id: str) -> Package | None:
+        i = self._shard(package_id)
+        with self._locks[i]:
+            shard = self._shards[i]
+            pkg = shard.get(package_id)
+            if pkg is not None:
+                shard.move_to_end(package_id)
+            return pkg
+
+    def _cache_put(self, package_id: str, pkg: Package) -> None:
+        i = self._shard(package_id)
+        with self._locks[i]:
+            shard = self._shards[i]
+            shard[package_id] = pkg
+            shard.move_to_end(package_id)
+            if len(shard) > self._shard_size:
+                shard.popitem(last=False)
+
+    def _cache_pop(self, package_id: str) -> None:
+        i = self._shard(package_id)
+        with self._locks[i]:
+            self._shards[i].pop(package_id, None)
+
+    def _fetch(self, package_id: str) -> Package | None:
+        """Backend get_package, caching hits and misses."""
+        writes = self._writes
         res = self.wrapped.get_package(package_id)
         if res:
-            self._cache[package_id] = res
+            self._cache_put(package_id, res)
+        elif writes == self._writes:
+            self._missing[package_id] = True
         return res
 
+    def get_package(self, package_id: str):
+        res = self._cache_get(package_id)
+        if res is not None or package_id in self._missing:
+            return res
+        with self._inflight_lock:
+            event = self._inflight.get(package_id)
+            leader = event is None
+            if leader:
+                event = self._inflight[package_id] = threading.Event()
+        if not leader:
+            # Another thread is fetching this id; use its result
+            event.wait()
+            res = self._cache_get(package_id)
+            if res is not None or package_id in self._missing:
+                return res
+            return self._fetch(package_id)  # its fetch failed or raced a write
+        try:
+            return self._fetch(package_id)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[package_id]
+            event.set()
+
+    def exists(self, package_id: str) -> bool:
+        if self._cache_get(package_id) is not None:
+            return True
+        return package_id not in self._missing and self.wrapped.exists(package_id)
+
+    def get_package_content(self, package_id: str) -> str | None:
+        pkg = self.get_package(package_id)
+        return None if pkg is None else pkg.data.content or ""
+
     def add_package(self, p):
+        self._writes += 1
         self.wrapped.add_package(p)
-        self._cache[p.metadata.id] = p
+        self._missing.pop(p.metadata.id)
+        self._cache_put(p.metadata.id, p)
+
+    def bulk_add_packages(self, packages):
+        packages = list(packages)
+        self._writes += 1
+        self.wrapped.bulk_add_packages(packages)
+        for p in packages:
+            self._missing.pop(p.metadata.id)
+            self._cache_put(p.metadata.id, p)
 
     def delete_package(self, pid):
+        self._writes += 1
         res = self.wrapped.delete_package(pid)
-        if pid in self._cache:
-            del self._cache[pid]
+        self._cache_pop(pid)
         return res
         
     def reset(self):
-        self._cache.clear()
+        self._writes += 1
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                shard.clear()
+        self._missing.clear()
         self.wrapped.reset()
 
     def __getattr__(self, name):
@@ -2,6 +2,7 @@
 Bedrock client for LLM-based metric analysis.
 Uses caching to avoid redundant API calls.
 """
+import base64
 import hashlib
 import json
 import os
@@ -47,8 +48,9 @@ class BedrockClient:
         )
     
     def _get_cache_key(self, prompt: str) -> str:
-        """Generate cache key from prompt."""
-        return hashlib.md5(prompt.encode()).hexdigest()
+        """Generate cache key from prompt: 128-bit BLAKE2b in lowercase base32 (26 chars)."""
+        digest = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        return base64.b32encode(digest).decode().rstrip("=").lower()
     
     def _get_cached_response(self, cache_key: str) -> dict | None:
         """Retrieve cached response if available and fresh."""
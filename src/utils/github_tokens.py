@@ -0,0 +1,85 @@
+"""
+GitHub Token Pool Module.
+
+Rotates GitHub API calls across several tokens and tracks each token's rate
+limit from the response headers, so a batch of ratings spreads its requests
+over every token's hourly quota and skips tokens GitHub has told us are
+exhausted instead of burning a round-trip on a guaranteed 403.
+
+Tokens come from GITHUB_TOKENS (comma-separated) plus GITHUB_TOKEN.
+"""
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Mapping
+
+
+class GitHubTokenPool:
+    """Thread-safe round-robin over tokens, skipping rate-limited ones."""
+
+    def __init__(self, tokens: Iterable[str], timer: Callable[[], float] = time.time):
+        self._tokens = deque(dict.fromkeys(t for t in tokens if t))  # dedupe, keep order
+        self._available_at = dict.fromkeys(self._tokens, 0.0)
+        self._timer = timer
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "GitHubTokenPool":
+        raw = os.environ.get("GITHUB_TOKENS", "").split(",") + [os.environ.get("GITHUB_TOKEN", "")]
+        # Skip the placeholder shipped in the sample .env
+        return cls(t.strip() for t in raw if t.strip() and not t.strip().startswith("ghp_REPLACE"))
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def acquire(self) -> str | None:
+        """
+        Next token to use, or None when no tokens are configured.
+
+        Picks the next token in rotation that isn't rate limited. If all are,
+        returns the one that frees up soonest rather than blocking the caller.
+        """
+        with self._lock:
+            if not self._tokens:
+                return None
+            now = self._timer()
+            for _ in range(len(self._tokens)):
+                token = self._tokens[0]
+                self._tokens.rotate(-1)
+                if self._available_at[token] <= now:
+                    return token
+            return min(self._tokens, key=self._available_at.__getitem__)
+
+    def update(self, token: str | None, headers: Mapping[str, str]) -> None:
+        """Record rate-limit state from a GitHub response made with `token`."""
+        if token not in self._available_at:
+            return
+        now = self._timer()
+        until = None
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            until = now + int(retry_after)
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            reset = headers.get("X-RateLimit-Reset", "")
+            until = float(reset) if reset.isdigit() else now + 60
+        if until is not None:
+            with self._lock:
+                self._available_at[token] = max(self._available_at[token], until)
+
+    def auth_headers(self, token: str | None) -> dict[str, str]:
+        return {"Authorization": f"token {token}"} if token else {}
+
+
+_POOL: GitHubTokenPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_token_pool() -> GitHubTokenPool:
+    """Process-wide pool, built from the environment on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = GitHubTokenPool.from_env()
+    return _POOL
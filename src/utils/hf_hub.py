@@ -0,0 +1,35 @@
+"""
+HuggingFace Hub Module.
+
+Process-wide memoized wrappers around huggingface_hub lookups. Several metrics
+ask for the same model's info while rating one resource; these share a single
+Hub round-trip per repo for a few minutes.
+
+The huggingface_hub module-level functions are bound methods of one shared
+HfApi, so every lookup here also reuses the same HTTP session.
+"""
+from huggingface_hub import dataset_info as _dataset_info
+from huggingface_hub import list_repo_files as _list_repo_files
+from huggingface_hub import model_info as _model_info
+
+from src.utils.cache import ttl_cache
+
+HF_INFO_TTL = 300  # seconds
+
+
+@ttl_cache(maxsize=256, ttl=HF_INFO_TTL)
+def model_info(repo_id: str):
+    """Cached huggingface_hub.model_info(repo_id)."""
+    return _model_info(repo_id)
+
+
+@ttl_cache(maxsize=256, ttl=HF_INFO_TTL)
+def dataset_info(repo_id: str):
+    """Cached huggingface_hub.dataset_info(repo_id)."""
+    return _dataset_info(repo_id)
+
+
+@ttl_cache(maxsize=256, ttl=HF_INFO_TTL)
+def list_repo_files(repo_id: str) -> tuple[str, ...]:
+    """Cached huggingface_hub.list_repo_files(repo_id), as a tuple so callers can't mutate it."""
+    return tuple(_list_repo_files(repo_id))
@@ -0,0 +1,29 @@
+"""
+HTTP Session Utility Module.
+
+One process-wide requests.Session so metric calls to the same host (e.g.
+api.github.com) reuse pooled keep-alive connections instead of paying a new
+TCP+TLS handshake per request. Transient gateway errors are retried with
+backoff.
+
+Credentials stay per-request: the session is shared across hosts, so setting
+an Authorization header here would leak a GitHub token to other sites.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+SESSION = _build_session()
@@ -0,0 +1,67 @@
+"""
+Resource Module.
+
+Parses a resource's URL once so metrics can read its source and identifiers
+instead of each re-splitting the URL.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# Repo id is one or two path segments (legacy models have no org), optionally
+# under datasets/; anything after it (/tree/main, ?query, #anchor) is dropped.
+_HF_RE = re.compile(r"huggingface\.co/((?:datasets/)?[^/?#]+(?:/[^/?#]+)?)")
+_GH_RE = re.compile(r"github\.com/([^/?#]+)/([^/?#]+)")
+
+
+def normalize_resource(resource: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add parsed URL fields to `resource` in place and return it.
+
+    Sets:
+        kind: "hf" for huggingface.co URLs, "github" for github.com URLs,
+            otherwise "local".
+        hf_repo_id: Repo id after "huggingface.co/", or "" if none (HF only).
+        owner, repo: Owner and repo name, or "" if none (GitHub only).
+
+    Idempotent: a resource that already has "kind" is returned unchanged, so
+    metrics can call it on resources that skipped ingest (e.g. in tests).
+    """
+    if "kind" in resource:
+        return resource
+
+    url = resource.get("url") or ""
+    if "huggingface.co" in url:
+        m = _HF_RE.search(url)
+        resource["hf_repo_id"] = m.group(1) if m else ""
+        resource["kind"] = "hf"
+    elif "github.com" in url:
+        m = _GH_RE.search(url)
+        resource["owner"], resource["repo"] = m.groups() if m else ("", "")
+        resource["kind"] = "github"
+    else:
+        resource["kind"] = "local"
+    return resource
+
+
+@dataclass(slots=True, frozen=True)
+class ResourceRef:
+    """
+    Typed, read-only view of a resource for metrics with a typed entry point.
+
+    `category` is upper-cased at construction so hot paths compare it directly.
+    """
+    category: str
+    url: str = ""
+    name: str = ""
+    hf_repo_id: str = ""
+
+    @classmethod
+    def from_dict(cls, resource: dict[str, Any]) -> "ResourceRef":
+        normalize_resource(resource)
+        return cls(
+            category=(resource.get("category") or "").upper(),
+            url=resource.get("url") or "",
+            name=resource.get("name") or "",
+            hf_repo_id=resource.get("hf_repo_id", ""),
+        )
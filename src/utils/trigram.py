@@ -0,0 +1,109 @@
+"""
+Trigram Module.
+
+Prefilter for regex search: a package can only match a regex if its text
+contains every trigram of the literal runs the regex requires, so storage
+backends keep a trigram -> package index and run the regex only on the
+packages that pass (the approach of Russ Cox's codesearch).
+
+compile_search() then checks the survivors, with plain substring tests
+instead of the backtracking engine when the regex is only literals.
+
+Search is case-insensitive, so both sides are folded. Only ASCII literals
+are used; the few non-ASCII characters that match an ASCII letter under
+re.IGNORECASE are folded onto it in the text.
+"""
+import re
+from collections.abc import Callable
+from re import _constants as sre
+from re import _parser as sre_parse
+
+# Non-ASCII characters re.IGNORECASE matches against an ASCII letter.
+# Translated before lower() so "İ" doesn't expand to two characters.
+_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+_REPEATS = (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT)
+
+
+def _fold(text: str) -> str:
+    return text.translate(_FOLD).lower()
+
+
+def trigrams(text: str | None) -> set[str]:
+    """Distinct case-folded trigrams of `text`."""
+    if not text:
+        return set()
+    folded = _fold(text)
+    return {folded[i:i + 3] for i in range(len(folded) - 2)}
+
+
+def _literal_runs(pattern: sre_parse.SubPattern, runs: list[str]) -> None:
+    """Append the literal runs every match of `pattern` must contain."""
+    run: list[str] = []
+    for op, av in pattern:
+        if op is sre.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        runs.append("".join(run))
+        run = []
+        if op is sre.SUBPATTERN:
+            _literal_runs(av[-1], runs)
+        elif op is sre.ATOMIC_GROUP:
+            _literal_runs(av, runs)
+        elif op in _REPEATS and av[0] >= 1:
+            _literal_runs(av[2], runs)
+        # Alternations, classes, optional repeats etc. require nothing
+    runs.append("".join(run))
+
+
+def required_trigrams(regex: str) -> set[str]:
+    """
+    Trigrams any text matching `regex` (case-insensitively) must contain.
+
+    Empty when the regex has no literal run of three or more characters,
+    meaning the caller has to scan everything. Raises re.error for an
+    invalid regex.
+    """
+    runs: list[str] = []
+    _literal_runs(sre_parse.parse(regex), runs)
+    return set().union(*(trigrams(run) for run in runs))
+
+
+def literal_alternatives(regex: str) -> tuple[str, ...] | None:
+    """
+    The case-folded literals of a regex that is just "lit", "a|b|c" or
+    "(?:a|b|c)", or None if it is anything else (or not all ASCII).
+
+    Raises re.error for an invalid regex.
+    """
+    parsed = sre_parse.parse(regex)
+    if parsed.state.flags & (re.ASCII | re.LOCALE):
+        return None  # IGNORECASE no longer folds the way _fold does
+    items = list(parsed)
+    if len(items) == 1 and items[0][0] is sre.SUBPATTERN and not any(items[0][1][1:3]):
+        items = list(items[0][1][3])  # group without flag changes
+    branches = items[0][1][1] if len(items) == 1 and items[0][0] is sre.BRANCH else [items]
+    literals = []
+    for branch in branches:
+        if not all(op is sre.LITERAL and av < 128 for op, av in branch):
+            return None
+        literals.append("".join(chr(av) for _, av in branch).lower())
+    return tuple(literals)
+
+
+def compile_search(regex: str) -> Callable[[str], bool]:
+    """
+    Case-insensitive `search(text)` for `regex`, truthy when it matches.
+
+    Literal alternations are matched with substring tests on the folded text,
+    which is linear and can't backtrack; everything else uses re. Raises
+    re.error for an invalid regex.
+    """
+    literals = literal_alternatives(regex)
+    if literals is None:
+        return re.compile(regex, re.IGNORECASE).search
+
+    def search(text: str) -> bool:
+        folded = _fold(text)
+        return any(lit in folded for lit in literals)
+    return search
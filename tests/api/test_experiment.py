@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
@@ -10,9 +10,9 @@ def test_perf_experiment_endpoint():
     """Smoke test to verify performance experiment endpoint runs."""
     # We mock _generate_dummy_data and concurrent execution to be fast
     with patch("src.api.experiment._generate_dummy_data"):
-        # We also want to intercept get_package to avoid real storage
-        with patch("src.api.experiment.storage.get_package") as mock_get:
-            mock_get.return_value = MagicMock(data=MagicMock(content="x"))
+        # We also want to intercept get_package_content to avoid real storage
+        with patch("src.api.experiment.storage.get_package_content") as mock_get:
+            mock_get.return_value = "x"
             
             response = client.post("/admin/perf_test", json={
                 "num_models": 10,
@@ -24,3 +24,70 @@ def test_perf_experiment_endpoint():
             data = response.json()
             assert "mean_latency" in data
             assert data["total_requests"] == 5
+
+
+def test_percentile_interpolates_sorted_values():
+    from src.api.experiment import _percentile
+
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert _percentile(values, 50) == 2.5
+    assert _percentile(values, 100) == 4.0
+    assert _percentile([7.0], 99) == 7.0
+
+
+def test_dummy_content_is_encoded_once():
+    import base64
+
+    from src.api.experiment import _dummy_content
+
+    payload = _dummy_content(2)
+    assert payload is _dummy_content(2)
+    assert base64.b64decode(payload) == b"x" * 2048
+
+
+def test_perf_experiment_against_fresh_storage():
+    """End-to-end run on an isolated LocalStorage: every client should find its package."""
+    from src.services.storage import LocalStorage
+
+    with patch("src.api.experiment.storage", LocalStorage()):
+        response = client.post("/admin/perf_test", json={
+            "num_models": 5,
+            "num_clients": 20,
+            "model_size_kb": 1
+        })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["errors"] == 0
+    assert data["total_requests"] == 20
+    assert data["p99_latency"] >= data["median_latency"]
+
+
+def test_run_client_task_fills_and_uses_content_cache():
+    from src.api.experiment import _run_client_task
+
+    cache = {}
+    with patch("src.api.experiment.storage.get_package_content") as mock_get:
+        mock_get.return_value = "payload"
+        _, _, ok = _run_client_task(0, ("perf-0",), cache)
+        assert ok and cache == {"perf-0": "payload"}
+        _, _, ok = _run_client_task(1, ("perf-0",), cache)
+        assert ok
+        assert mock_get.call_count == 1
+
+
+def test_run_client_batch_covers_its_slice():
+    from src.api.experiment import _run_client_batch
+
+    with patch("src.api.experiment.storage.get_package_content", return_value="x"):
+        results = _run_client_batch(range(1, 10, 3), ("perf-0",), None)
+    assert [idx for idx, _, _ in results] == [1, 4, 7]
+    assert all(ok for _, _, ok in results)
+
+
+def test_latency_stats_handles_empty_and_single_samples():
+    from src.api.experiment import _latency_stats
+
+    assert _latency_stats([]) == (0.0, 0.0, 0.0)
+    mean, median, p99 = _latency_stats([2_000_000_000])
+    assert mean == median == p99 == 2.0
@@ -96,6 +96,8 @@ def test_rate_package():
         data = response.json()
         assert data["net_score"] == 0.85
         assert data["net_score_latency"] == 70
+        assert data["name"] == "repo"
+        assert data["category"] == "code"
 
 def test_get_packages_empty():
     client.delete("/reset")
@@ -134,6 +136,12 @@ def test_get_packages_empty():
     assert response.status_code == 200
     assert len(response.json()) == 10
 
+    # The next page resumes after the last id seen
+    last_id = response.json()[-1]["id"]
+    response = client.post(f"/packages?cursor={last_id}", json=query)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
 def test_plural_routes():
     client.delete("/reset")
     # Upload a code package
@@ -186,6 +194,23 @@ def test_rate_and_cost_structure():
         else:
             assert "cost" in data or "total_cost" in data
 
+
+def test_cost_uses_cached_size_score():
+    from src.api.routes import size_score_cache
+
+    client.delete("/reset")
+    response = client.post("/artifact/code", json={"content": "UEsDBAoAAAAAA...", "jsprogram": "js", "name": "cost-test"})
+    pkg_id = response.json()["metadata"]["id"]
+    client.get(f"/package/{pkg_id}/rate")
+    assert size_score_cache[pkg_id] == 0
+
+    # Zero score is clamped to 0.01 -> 9900 MB
+    expected = {pkg_id: {"total_cost": 9900.0}}
+    assert client.get(f"/artifact/model/{pkg_id}/cost").json() == expected
+    # Falls back to the cached rating JSON when the projection is gone
+    size_score_cache.clear()
+    assert client.get(f"/artifact/model/{pkg_id}/cost").json() == expected
+
 def test_upload_package():
     # Test uploading a package via Content (Base64)
     client.delete("/reset")
@@ -318,6 +343,16 @@ def test_rate_package_no_url():
     # Expect all 0s
     assert data["net_score"] == 0
 
+    # Second call is served from the cached JSON bytes unchanged
+    from src.api.routes import rating_cache
+    assert isinstance(rating_cache[pkg_id], bytes)
+    again = client.get(f"/package/{pkg_id}/rate")
+    assert again.content == response.content
+
+    # Deleting the package evicts its cached rating
+    client.delete(f"/package/{pkg_id}")
+    assert pkg_id not in rating_cache
+
 def test_upload_model():
     client.delete("/reset")
     
@@ -333,3 +368,150 @@ def test_upload_model():
     assert response.status_code == 201
     data = response.json()
     assert data["metadata"]["type"] == "model"
+
+def test_concurrent_rate_misses_compute_once():
+    import asyncio
+    import threading
+    import time
+    from unittest.mock import patch
+
+    from src.api import routes
+    from src.api.models import Package, PackageData, PackageMetadata, PackageRating
+
+    client.delete("/reset")
+    storage.add_package(Package(
+        metadata=PackageMetadata(name="sf", version="1.0.0", id="sf-id"),
+        data=PackageData(url="https://github.com/test/sf")
+    ))
+    rating = PackageRating(
+        bus_factor=1, bus_factor_latency=0,
+        code_quality=1, code_quality_latency=0,
+        ramp_up_time=1, ramp_up_time_latency=0,
+        responsive_maintainer=1, responsive_maintainer_latency=0,
+        license=1, license_latency=0,
+        good_pinning_practice=1, good_pinning_practice_latency=0,
+        reviewedness=1, reviewedness_latency=0,
+        net_score=1.0, net_score_latency=0,
+        tree_score=1.0, tree_score_latency=0,
+        reproducibility=1.0, reproducibility_latency=0,
+        performance_claims=1.0, performance_claims_latency=0,
+        dataset_and_code_score=1.0, dataset_and_code_score_latency=0,
+        dataset_quality=1.0, dataset_quality_latency=0,
+        size_score=SizeScore(raspberry_pi=1.0, jetson_nano=1.0, desktop_pc=1.0, aws_server=1.0), size_score_latency=0
+    )
+    calls = []
+
+    def slow_compute(url):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return rating
+
+    async def burst():
+        return await asyncio.gather(*(routes._get_rating_payload("sf-id") for _ in range(10)))
+
+    with patch("src.api.routes.compute_package_rating", side_effect=slow_compute):
+        payloads = asyncio.run(burst())
+
+    assert len(calls) == 1
+    assert calls[0] != threading.main_thread().name  # ran in a worker thread
+    assert len(set(payloads)) == 1
+    assert routes._inflight_ratings == {}
+
+def test_save_rating_runs_off_the_request_path():
+    import asyncio
+    import threading
+    from unittest.mock import MagicMock, patch
+
+    from src.api import routes
+
+    release = threading.Event()
+    fake_storage = MagicMock()
+    fake_storage.save_rating.side_effect = lambda pid, js: release.wait(5)
+
+    async def scenario():
+        routes._save_rating_later("pid", "{}")
+        # Returned before the (blocked) PUT finished
+        assert len(routes._pending_saves) == 1
+        release.set()
+        await asyncio.gather(*routes._pending_saves)
+
+    with patch.object(routes, "storage", fake_storage):
+        asyncio.run(scenario())
+    fake_storage.save_rating.assert_called_once_with("pid", "{}")
+    assert not routes._pending_saves
+
+def test_invalidate_waits_for_pending_rating_save():
+    import asyncio
+    import threading
+    from unittest.mock import MagicMock, patch
+
+    from src.api import routes
+
+    release = threading.Event()
+    order = []
+    fake_storage = MagicMock()
+    fake_storage.save_rating.side_effect = lambda pid, js: release.wait(5) and order.append("save")
+    fake_storage.delete_rating.side_effect = lambda pid: order.append("delete")
+
+    async def scenario():
+        routes._save_rating_later("pid", "{}")
+        invalidate = asyncio.ensure_future(routes._invalidate("pid"))
+        await asyncio.sleep(0.05)
+        # Delete waits for the in-flight save instead of racing it
+        assert order == []
+        release.set()
+        await invalidate
+
+    with patch.object(routes, "storage", fake_storage):
+        asyncio.run(scenario())
+    assert order == ["save", "delete"]
+    assert not routes._pending_saves
+
+def test_package_history_shares_one_timestamp():
+    client.delete("/reset")
+    for _ in range(2):
+        client.post("/artifact/code", json={"content": "UEsDBAoAAAAAA...", "name": "hist-pkg"})
+    response = client.get("/artifact/byName/hist-pkg")
+    assert response.status_code == 200
+    dates = {entry["Date"] for entry in response.json()}
+    assert len(response.json()) == 2
+    assert len(dates) == 1
+    assert dates.pop().endswith("Z")
+
+def test_ingest_rates_model_off_the_event_loop():
+    import threading
+    from unittest.mock import patch
+
+    from src.api.models import PackageRating
+
+    client.delete("/reset")
+    threads = []
+
+    def compute(url):
+        threads.append(threading.current_thread())
+        return PackageRating(
+            bus_factor=1, bus_factor_latency=0,
+            code_quality=1, code_quality_latency=0,
+            ramp_up_time=1, ramp_up_time_latency=0,
+            responsive_maintainer=1, responsive_maintainer_latency=0,
+            license=1, license_latency=0,
+            good_pinning_practice=1, good_pinning_practice_latency=0,
+            reviewedness=1, reviewedness_latency=0,
+            net_score=1.0, net_score_latency=0,
+            tree_score=1.0, tree_score_latency=0,
+            reproducibility=1.0, reproducibility_latency=0,
+            performance_claims=1.0, performance_claims_latency=0,
+            dataset_and_code_score=1.0, dataset_and_code_score_latency=0,
+            dataset_quality=1.0, dataset_quality_latency=0,
+            size_score=SizeScore(raspberry_pi=1.0, jetson_nano=1.0, desktop_pc=1.0, aws_server=1.0), size_score_latency=0
+        )
+
+    with patch("src.api.routes.compute_package_rating", side_effect=compute), \
+         patch("src.api.routes._fetch_github_readme", return_value=""):
+        response = client.post("/artifact/model", json={"url": "https://github.com/test/repo"})
+        assert response.status_code == 201
+        # The ingest-time rating is already cached; rating doesn't recompute
+        rated = client.get(f"/package/{response.json()['metadata']['id']}/rate").json()
+    assert len(threads) == 1
+    assert threads[0].name.startswith("asyncio_")  # default executor worker
+    assert (rated["name"], rated["category"]) == ("repo", "model")
@@ -85,6 +85,14 @@ def test_lineage_endpoint():
         data = response.json()
         assert "nodes" in data
         assert "edges" in data
+        assert {"artifact_id": pkg_id, "name": "test-model", "source": "config_json"} in data["nodes"]
+
+        # Unrelated artifacts are listed by default and dropped on request
+        other_id = client.post("/artifact/code", json={"content": "test", "name": "other"}).json()["metadata"]["id"]
+        ids = [n["artifact_id"] for n in client.get(f"/artifact/model/{pkg_id}/lineage").json()["nodes"]]
+        assert other_id in ids
+        response = client.get(f"/artifact/model/{pkg_id}/lineage", params={"include_unrelated": "false"})
+        assert [n["artifact_id"] for n in response.json()["nodes"]] == [pkg_id]
 
 
 def test_get_package_types():
@@ -118,3 +126,161 @@ def test_global_lineage():
         data = response.json()
         assert "nodes" in data or isinstance(data, list)
         assert "edges" in data or isinstance(data, list)
+
+
+def test_fetch_github_readme_prefers_main_and_falls_back_to_master():
+    """Both branches are probed with HEAD; only the winner's README is downloaded."""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+
+    import httpx
+
+    from src.api import routes
+
+    def fake_client(found: set[str]):
+        async def respond(url):
+            branch = url.split("/")[-2]
+            return httpx.Response(200 if branch in found else 404, text=f"# {branch}")
+        return MagicMock(head=AsyncMock(side_effect=respond), get=AsyncMock(side_effect=respond))
+
+    def fetch(client):
+        routes._readme_branch_cache.clear()
+        with patch("src.api.routes._get_http_client", return_value=client):
+            return asyncio.run(routes._fetch_github_readme("https://github.com/o/r"))
+
+    both = fake_client({"main", "master"})
+    assert fetch(both) == "# main"
+    assert both.head.await_count == 2
+    both.get.assert_awaited_once_with("https://raw.githubusercontent.com/o/r/main/README.md")
+    assert fetch(fake_client({"master"})) == "# master"
+    assert fetch(fake_client(set())) == ""
+
+
+def test_http_client_follows_redirects_and_is_reused_per_loop():
+    import asyncio
+
+    from src.api import routes
+
+    async def get_twice():
+        return routes._get_http_client(), routes._get_http_client()
+
+    first, again = asyncio.run(get_twice())
+    assert first is again
+    assert first.follow_redirects
+    other, _ = asyncio.run(get_twice())
+    assert other is not first  # a new loop gets its own pool
+
+
+def test_fetch_github_readme_caches_branch_resolution():
+    """Repeat fetches skip the HEAD probe, including for repos with no README."""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+
+    import httpx
+
+    from src.api import routes
+
+    routes._readme_branch_cache.clear()
+    missing = MagicMock(head=AsyncMock(return_value=httpx.Response(404)), get=AsyncMock())
+    with patch("src.api.routes._get_http_client", return_value=missing):
+        for _ in range(2):
+            assert asyncio.run(routes._fetch_github_readme("https://github.com/o/none")) == ""
+    assert missing.head.await_count == 2  # one probe per branch, once
+    missing.get.assert_not_awaited()
+
+
+def test_fetch_github_readme_does_not_cache_failed_probes():
+    """A network error or server error on either HEAD is retried on the next fetch."""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+
+    import httpx
+
+    from src.api import routes
+
+    for failure in (httpx.ConnectTimeout("timeout"), httpx.Response(503)):
+        routes._readme_branch_cache.clear()
+        flaky = MagicMock(head=AsyncMock(side_effect=[failure, httpx.Response(404)]), get=AsyncMock())
+        with patch("src.api.routes._get_http_client", return_value=flaky):
+            assert asyncio.run(routes._fetch_github_readme("https://github.com/o/flaky")) == ""
+        assert ("o", "flaky") not in routes._readme_branch_cache
+
+
+def test_fetch_hf_readme_falls_back_to_dataset(tmp_path):
+    """A dataset id still resolves when the model probe fails."""
+    import asyncio
+
+    from src.api import routes
+
+    readme = tmp_path / "README.md"
+    readme.write_text("# dataset card", encoding="utf-8")
+
+    def fake_download(repo_id, filename, repo_type):
+        if repo_type == "dataset":
+            return str(readme)
+        raise Exception("404")
+
+    with patch("huggingface_hub.hf_hub_download", side_effect=fake_download):
+        assert asyncio.run(routes._fetch_hf_readme("https://huggingface.co/datasets-owner/ds")) == "# dataset card"
+    with patch("huggingface_hub.hf_hub_download", side_effect=Exception("offline")):
+        assert asyncio.run(routes._fetch_hf_readme("https://huggingface.co/o/m")) == ""
+
+
+def test_fetch_hf_readme_prefers_model_over_faster_dataset(tmp_path):
+    """An id that is both a model and a dataset gets the model card, whichever finishes first."""
+    import asyncio
+    import threading
+
+    from src.api import routes
+
+    model_card = tmp_path / "model.md"
+    model_card.write_text("# model card", encoding="utf-8")
+    dataset_card = tmp_path / "dataset.md"
+    dataset_card.write_text("# dataset card", encoding="utf-8")
+    dataset_done = threading.Event()
+
+    def fake_download(repo_id, filename, repo_type):
+        if repo_type == "dataset":
+            dataset_done.set()
+            return str(dataset_card)
+        dataset_done.wait(5)  # the model download finishes last
+        return str(model_card)
+
+    with patch("huggingface_hub.hf_hub_download", side_effect=fake_download):
+        assert asyncio.run(routes._fetch_hf_readme("https://huggingface.co/o/both")) == "# model card"
+
+
+def test_global_lineage_cached_until_storage_changes():
+    """The serialized graph is reused until a write bumps storage.version."""
+    import asyncio
+    import json
+
+    from src.api import routes
+    from src.api.models import Package, PackageData, PackageMetadata
+
+    client.delete("/reset")
+    routes.storage.add_package(Package(
+        metadata=PackageMetadata(name="m", version="1.0.0", id="lin-m", type="model"),
+        data=PackageData(content="x")
+    ))
+    with patch.object(routes, "_build_global_lineage", wraps=routes._build_global_lineage) as build:
+        def fetch():
+            return json.loads(asyncio.run(routes.get_global_lineage()).body)
+
+        first = fetch()
+        second = fetch()
+        assert build.call_count == 1
+        assert first == second
+        assert [n["artifact_id"] for n in first["nodes"]] == ["lin-m"]
+
+        routes.storage.add_package(Package(
+            metadata=PackageMetadata(name="d", version="1.0.0", id="lin-d", type="dataset"),
+            data=PackageData(content="x")
+        ))
+        third = fetch()
+        assert build.call_count == 2
+        assert third["edges"] == [{
+            "from_node_artifact_id": "lin-m",
+            "to_node_artifact_id": "lin-d",
+            "relationship": "uses"
+        }]
@@ -43,7 +43,8 @@ def test_bedrock_cache_operations(tmp_path, mocker):
     # Test cache key generation
     key = client._get_cache_key("test prompt")
     assert isinstance(key, str)
-    assert len(key) == 32  # MD5 hash length
+    assert len(key) == 26  # 128-bit digest in unpadded base32
+    assert key.isalnum() and key.islower()
     
     # Test caching response
     client._cache_response(key, {"score": 0.5, "reason": "test"})
@@ -1,6 +1,8 @@
+import subprocess
+
 import pytest
 
-from src.metrics.bus_factor import compute_bus_factor
+from src.metrics.bus_factor import commit_authors, compute_bus_factor, metric
 
 
 def test_single_contributor_low_score():
@@ -41,3 +43,35 @@ def test_skewed_contributions_intermediate_score():
     assert 0.0 < score < 1.0
     assert isinstance(latency, int)
     assert latency >= 0
+
+
+def test_skewed_contributions_matches_normalized_entropy():
+    """90/10 split: H = -(0.9*log2 0.9 + 0.1*log2 0.1), normalized by log2(2) = 1."""
+    score, _ = compute_bus_factor(["alice"] * 90 + ["bob"] * 10)
+    assert score == pytest.approx(0.4689955935892812)
+
+
+def _commit(repo, email, name):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", f"user.email={email}", "-c", f"user.name={name}",
+         "commit", "--allow-empty", "-q", "-m", "c"],
+        check=True,
+    )
+
+
+def test_commit_authors_reads_git_log(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    _commit(tmp_path, "alice@x.org", "Alice")
+    _commit(tmp_path, "", "Bob")
+    _commit(tmp_path, "alice@x.org", "Alice")
+
+    assert commit_authors(str(tmp_path)) == ["alice@x.org", "Bob", "alice@x.org"]
+    assert commit_authors(str(tmp_path), max_count=1) == ["alice@x.org"]
+
+    score, _ = metric({"local_path": str(tmp_path)})
+    assert 0.0 < score < 1.0
+
+
+def test_commit_authors_not_a_repo(tmp_path):
+    with pytest.raises(subprocess.CalledProcessError):
+        commit_authors(str(tmp_path))
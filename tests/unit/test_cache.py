@@ -0,0 +1,91 @@
+# tests/unit/test_cache.py
+"""Tests for the in-process TTL/LRU cache."""
+import pytest
+
+from src.utils.cache import TTLCache, ttl_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_dict_api():
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache["a"] = 1
+    assert "a" in cache
+    assert cache["a"] == 1
+    assert cache.get("missing") is None
+    with pytest.raises(KeyError):
+        cache["missing"]
+    assert cache.pop("a") == 1
+    assert "a" not in cache
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, timer=clock)
+    cache["a"] = 1
+    cache.set("b", 2, ttl=100)
+    clock.now = 11
+    assert "a" not in cache
+    assert cache["b"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")  # touch a so b is the LRU entry
+    cache["c"] = 3
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert len(cache) == 2
+
+
+def test_ttl_cache_decorator_memoizes_successes_only():
+    calls = []
+
+    @ttl_cache(maxsize=4, ttl=10)
+    def lookup(repo_id, fail=False):
+        calls.append(repo_id)
+        if fail:
+            raise RuntimeError(repo_id)
+        return repo_id.upper()
+
+    assert lookup("a") == "A"
+    assert lookup("a") == "A"
+    assert calls == ["a"]
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            lookup("b", fail=True)
+    assert calls == ["a", "b", "b"]
+
+    lookup.cache_clear()
+    lookup("a")
+    assert calls == ["a", "b", "b", "a"]
+
+
+def test_hf_model_info_shared_across_callers(mocker):
+    from src.utils import hf_hub
+
+    hf_hub.model_info.cache_clear()
+    fetch = mocker.patch("src.utils.hf_hub._model_info", return_value="info")
+    assert hf_hub.model_info("org/model") == "info"
+    assert hf_hub.model_info("org/model") == "info"
+    fetch.assert_called_once_with("org/model")
+    hf_hub.model_info.cache_clear()
+
+
+def test_hf_list_repo_files_cached_as_tuple(mocker):
+    from src.utils import hf_hub
+
+    hf_hub.list_repo_files.cache_clear()
+    fetch = mocker.patch("src.utils.hf_hub._list_repo_files", return_value=["README.md"])
+    assert hf_hub.list_repo_files("org/model") == ("README.md",)
+    assert hf_hub.list_repo_files("org/model") == ("README.md",)
+    fetch.assert_called_once_with("org/model")
+    hf_hub.list_repo_files.cache_clear()
@@ -1,21 +1,16 @@
 # tests/unit/test_code_quality.py
 """Tests for code_quality metric."""
-from unittest.mock import MagicMock
-
 from src.metrics.code_quality import metric
 
 
 def test_code_quality_huggingface_model(mocker):
     """Test code_quality for HuggingFace model."""
-    # Mock HfApi
-    mock_api = MagicMock()
-    mock_api.list_repo_files.return_value = [
+    mocker.patch("src.metrics.code_quality.list_repo_files", return_value=(
         "config.json", 
         "README.md", 
         "model_card.md",
         "pytorch_model.bin"
-    ]
-    mocker.patch("huggingface_hub.HfApi", return_value=mock_api)
+    ))
     
     resource = {
         "url": "https://huggingface.co/test/model",
@@ -30,7 +25,7 @@ def test_code_quality_huggingface_model(mocker):
 
 def test_code_quality_huggingface_api_error(mocker):
     """Test code_quality when HF API fails."""
-    mocker.patch("huggingface_hub.HfApi", side_effect=Exception("API Error"))
+    mocker.patch("src.metrics.code_quality.list_repo_files", side_effect=Exception("API Error"))
     
     resource = {
         "url": "https://huggingface.co/test/model",
@@ -103,3 +98,32 @@ def test_code_quality_empty_resource():
     
     assert score == 0.5
     assert latency >= 0
+
+
+def test_code_quality_dir_checks_need_directories(tmp_path):
+    """A plain file named like a directory check doesn't count; a missing path scores 0."""
+    (tmp_path / "tests").write_text("not a dir")
+    (tmp_path / ".gitlab-ci.yml").write_text("stages: []")
+
+    score, _ = metric({"url": "https://github.com/o/r", "local_path": str(tmp_path)})
+    assert score == 0.25  # only ci_cd
+
+    score, _ = metric({"url": "https://github.com/o/r", "local_path": str(tmp_path / "missing")})
+    assert score == 0.0
+
+
+def test_score_checks_runs_every_check():
+    """The score is always the full pass fraction, never a partial early exit."""
+    from src.metrics.code_quality import _score_checks
+
+    calls = []
+
+    def check(result):
+        def run():
+            calls.append(result)
+            return result
+        return run
+
+    checks = [check(False), check(False), check(True), check(True)]
+    assert _score_checks(checks) == 0.5
+    assert len(calls) == 4
@@ -0,0 +1,47 @@
+# tests/unit/test_github_tokens.py
+"""Tests for the rate-limit-aware GitHub token pool."""
+from src.utils.github_tokens import GitHubTokenPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_from_env_merges_and_skips_placeholder(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKENS", "a, b,,a")
+    monkeypatch.setenv("GITHUB_TOKEN", "ghp_REPLACE_ME")
+    pool = GitHubTokenPool.from_env()
+    assert len(pool) == 2
+    assert pool.acquire() == "a"
+
+
+def test_empty_pool_means_unauthenticated():
+    pool = GitHubTokenPool([])
+    token = pool.acquire()
+    assert token is None
+    assert pool.auth_headers(token) == {}
+
+
+def test_round_robin_skips_exhausted_tokens():
+    clock = FakeClock()
+    pool = GitHubTokenPool(["a", "b", "c"], timer=clock)
+    assert [pool.acquire() for _ in range(4)] == ["a", "b", "c", "a"]
+
+    pool.update("b", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2000"})
+    pool.update("c", {"Retry-After": "30"})
+    assert [pool.acquire() for _ in range(3)] == ["a", "a", "a"]
+
+    clock.now = 1031  # c's Retry-After has passed, b is still exhausted
+    assert {pool.acquire() for _ in range(3)} == {"a", "c"}
+
+
+def test_all_exhausted_returns_soonest_available():
+    clock = FakeClock()
+    pool = GitHubTokenPool(["a", "b"], timer=clock)
+    pool.update("a", {"Retry-After": "600"})
+    pool.update("b", {"Retry-After": "60"})
+    assert pool.acquire() == "b"
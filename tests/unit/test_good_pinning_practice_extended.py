@@ -80,3 +80,37 @@ def test_pinning_empty_resource():
     
     assert isinstance(score, float)
     assert latency >= 0
+
+
+def test_pinning_ignores_operators_in_inline_comments(tmp_path):
+    """Only an operator before the comment marker counts as a pin."""
+    (tmp_path / "requirements.txt").write_text(
+        "requests  # TODO pin ==2.31\n"
+        "numpy~=1.26  # compatible release\n"
+        "torch===2.1.0\n"
+    )
+    (tmp_path / "package.json").write_text('{"dependencies": {"a": "1.0.0", "b": "^2.0.0"}}')
+
+    score, _ = metric({"local_path": str(tmp_path)})
+    assert score == 3 / 5
+
+
+def test_pinning_package_json_counts_shared_dependency_once(tmp_path):
+    """A name in both dependency groups is scored once, by its devDependencies version."""
+    (tmp_path / "package.json").write_text(
+        '{"dependencies": {"a": "^1.0.0", "b": "2.0.0"},'
+        ' "devDependencies": {"a": "1.0.0", "c": "~3.0.0"}}'
+    )
+
+    score, _ = metric({"local_path": str(tmp_path)})
+    assert score == 2 / 3
+
+
+def test_pinning_package_json_tolerates_invalid_utf8(tmp_path):
+    """Undecodable bytes outside the dependency lists don't drop the file."""
+    (tmp_path / "package.json").write_bytes(
+        b'{"description": "caf\xe9", "dependencies": {"a": "1.0.0", "b": "^2.0.0"}}'
+    )
+
+    score, _ = metric({"local_path": str(tmp_path)})
+    assert score == 1 / 2
@@ -0,0 +1,14 @@
+# tests/unit/test_http_session.py
+"""Tests for the shared pooled HTTP session."""
+from src.utils.http_session import SESSION
+
+
+def test_session_pools_and_retries_gateway_errors():
+    adapter = SESSION.get_adapter("https://api.github.com/repos/o/r")
+    assert adapter._pool_maxsize == 64
+    assert adapter.max_retries.total == 3
+    assert set(adapter.max_retries.status_forcelist) == {502, 503, 504}
+
+
+def test_session_carries_no_credentials():
+    assert "Authorization" not in SESSION.headers
@@ -105,3 +105,24 @@ def test_compute_package_rating_no_repo(mocker):
     rating = compute_package_rating("https://github.com/user/repo")
     
     assert isinstance(rating, PackageRating)
+
+
+def test_compute_package_rating_runs_metrics_concurrently(mocker):
+    """Metrics overlap, so a rating takes about as long as its slowest metric."""
+    import threading
+
+    mocker.patch("src.utils.github_link_finder.find_github_url_from_hf", return_value=None)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def waiting_metric(r):
+        barrier.wait()  # only returns once all three metrics are running at once
+        return (0.5, 5.0)
+
+    mocker.patch("src.services.metrics_service.load_metrics", return_value={
+        "bus_factor": waiting_metric,
+        "license": waiting_metric,
+        "ramp_up_time": waiting_metric,
+    })
+
+    rating = compute_package_rating("https://huggingface.co/org/model")
+    assert rating.bus_factor == rating.license == rating.ramp_up_time == 0.5
@@ -105,3 +105,152 @@ def test_score_by_downloads_function():
     assert _score_by_downloads(15000) == 0.6
     assert _score_by_downloads(150000) == 0.8
     assert _score_by_downloads(5000000) == 1.0
+
+
+@pytest.mark.parametrize("downloads, expected", [
+    (100, 0.1), (101, 0.2), (1_000, 0.2), (10_000, 0.4),
+    (100_000, 0.6), (1_000_000, 0.8), (1_000_001, 1.0),
+])
+def test_score_by_downloads_boundaries(downloads, expected):
+    """Counts equal to a threshold stay in the lower tier."""
+    assert _score_by_downloads(downloads) == expected
+
+
+def test_performance_claims_reuses_readme_and_analysis(mocker, tmp_path):
+    """Repeat ratings of the same commit skip both the download and Bedrock."""
+    from src.metrics import performance_claims
+
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
+    readme = tmp_path / "README.md"
+    readme.write_text("## Benchmark\n| model | accuracy |\n| ours | 91.2 |")
+
+    info = FakeModelInfo(50)
+    info.sha = "abc123"
+    mocker.patch("src.metrics.performance_claims.model_info", return_value=info)
+    download = mocker.patch(
+        "src.metrics.performance_claims.hf_hub_download", return_value=str(readme)
+    )
+    bedrock = MagicMock()
+    bedrock.enabled = True
+    bedrock.analyze_readme_for_benchmarks.return_value = {"score": 0.7, "reason": "table"}
+    mocker.patch("src.metrics.performance_claims.get_bedrock_client", return_value=bedrock)
+
+    resource = {"name": "org/model", "url": "https://huggingface.co/org/model"}
+    assert metric(resource)[0] == 0.7
+    assert metric(resource)[0] == 0.7
+    download.assert_called_once_with(
+        repo_id="org/model", filename="README.md", repo_type="model", revision="abc123"
+    )
+    bedrock.analyze_readme_for_benchmarks.assert_called_once()
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
+
+
+def test_performance_claims_skips_bedrock_without_benchmark_terms(mocker, tmp_path):
+    """A README with under two benchmark keywords is scored by downloads alone."""
+    from src.metrics import performance_claims
+
+    performance_claims._revision_cache.clear()
+    readme = tmp_path / "README.md"
+    readme.write_text("# My model\nReports accuracy somewhere, eventually.")
+    mocker.patch("src.metrics.performance_claims.model_info", return_value=FakeModelInfo(1500))
+    mocker.patch("src.metrics.performance_claims.hf_hub_download", return_value=str(readme))
+    bedrock = MagicMock()
+    bedrock.enabled = True
+    mocker.patch("src.metrics.performance_claims.get_bedrock_client", return_value=bedrock)
+
+    score, _ = metric({"name": "org/plain", "url": "https://huggingface.co/org/plain"})
+    assert score == 0.4
+    bedrock.analyze_readme_for_benchmarks.assert_not_called()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", False),
+    ("F1 only", False),
+    ("MMLU and GLUE", True),
+    ("State-of-the-art BLEU", True),
+    ("F1score and accuracy", False),  # keywords must stand alone
+])
+def test_mentions_benchmarks(text, expected):
+    from src.metrics.performance_claims import _mentions_benchmarks
+
+    assert _mentions_benchmarks(text) is expected
+
+
+def test_performance_claims_revision_cache(mocker, tmp_path):
+    """A known commit skips the download, even when its README had no benchmarks;
+    a new commit with the same README re-downloads but reuses the Bedrock analysis."""
+    from src.metrics import performance_claims
+
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
+    plain = tmp_path / "plain.md"
+    plain.write_text("# Just a model")
+    bench = tmp_path / "bench.md"
+    bench.write_text("MMLU 70.1, GLUE 88.0")
+
+    bedrock = MagicMock()
+    bedrock.enabled = True
+    bedrock.analyze_readme_for_benchmarks.return_value = {"score": 0.5, "reason": "r"}
+    mocker.patch("src.metrics.performance_claims.get_bedrock_client", return_value=bedrock)
+    download = mocker.patch("src.metrics.performance_claims.hf_hub_download")
+    info = FakeModelInfo(0)
+    mocker.patch("src.metrics.performance_claims.model_info", return_value=info)
+    resource = {"name": "org/m", "url": "https://huggingface.co/org/m"}
+
+    download.return_value = str(plain)
+    info.sha = "c1"
+    assert metric(resource)[0] == 0.1
+    assert metric(resource)[0] == 0.1
+    assert download.call_count == 1
+
+    download.return_value = str(bench)
+    for sha in ("c2", "c3"):
+        info.sha = sha
+        assert metric(resource)[0] == 0.5
+    assert download.call_count == 3
+    bedrock.analyze_readme_for_benchmarks.assert_called_once()
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
+
+
+def test_analyze_readme_does_not_cache_bedrock_failures():
+    """A throttled call is retried next time instead of pinning its fallback score."""
+    from src.metrics import performance_claims
+
+    performance_claims._analysis_cache.clear()
+    bedrock = MagicMock()
+    bedrock.analyze_readme_for_benchmarks.side_effect = [
+        {"score": 0.6, "reason": "Bedrock failed: ThrottlingException"},
+        {"score": 0.9, "reason": "tables"},
+    ]
+    assert performance_claims._analyze_readme(bedrock, "MMLU 70")["score"] == 0.6
+    assert performance_claims._analyze_readme(bedrock, "MMLU 70")["score"] == 0.9
+    assert performance_claims._analyze_readme(bedrock, "MMLU 70")["score"] == 0.9
+    assert bedrock.analyze_readme_for_benchmarks.call_count == 2
+    performance_claims._analysis_cache.clear()
+
+
+def test_revision_cache_skips_bedrock_failures(mocker, tmp_path):
+    """A failed analysis isn't stored for the commit, so the next rating retries it."""
+    from src.metrics import performance_claims
+
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
+    readme = tmp_path / "README.md"
+    readme.write_text("MMLU 70.1, GLUE 88.0")
+    download = mocker.patch("src.metrics.performance_claims.hf_hub_download", return_value=str(readme))
+    bedrock = MagicMock()
+    bedrock.analyze_readme_for_benchmarks.side_effect = [
+        {"score": 0.6, "reason": "Bedrock failed: timeout"},
+        {"score": 0.8, "reason": "tables"},
+    ]
+
+    assert performance_claims._readme_analysis(bedrock, "org/m", "c1")["score"] == 0.6
+    assert ("org/m", "c1") not in performance_claims._revision_cache
+    assert performance_claims._readme_analysis(bedrock, "org/m", "c1")["score"] == 0.8
+    assert performance_claims._readme_analysis(bedrock, "org/m", "c1")["score"] == 0.8
+    assert download.call_count == 2
+    performance_claims._revision_cache.clear()
+    performance_claims._analysis_cache.clear()
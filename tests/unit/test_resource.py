@@ -0,0 +1,60 @@
+# tests/unit/test_resource.py
+"""Tests for resource URL normalization."""
+import dataclasses
+
+import pytest
+
+from src.utils.resource import ResourceRef, normalize_resource
+
+
+def test_normalize_huggingface_url():
+    r = normalize_resource({"url": "https://huggingface.co/google/gemma-2b/"})
+    assert r["kind"] == "hf"
+    assert r["hf_repo_id"] == "google/gemma-2b"
+    assert "owner" not in r
+
+
+def test_normalize_github_url():
+    r = normalize_resource({"url": "https://github.com/psf/requests/"})
+    assert r["kind"] == "github"
+    assert (r["owner"], r["repo"]) == ("psf", "requests")
+
+
+def test_normalize_other_or_missing_url():
+    assert normalize_resource({"url": "https://example.com/x"})["kind"] == "local"
+    assert normalize_resource({})["kind"] == "local"
+    assert normalize_resource({"url": None})["kind"] == "local"
+
+
+def test_normalize_is_idempotent_and_in_place():
+    resource = {"url": "https://github.com/a/b"}
+    assert normalize_resource(resource) is resource
+    resource["owner"] = "kept"
+    assert normalize_resource(resource)["owner"] == "kept"
+
+
+def test_normalize_drops_trailing_url_parts():
+    hf = normalize_resource({"url": "https://huggingface.co/org/model/tree/main?x=1"})
+    assert hf["hf_repo_id"] == "org/model"
+    gh = normalize_resource({"url": "https://github.com/o/r/tree/main#readme"})
+    assert (gh["owner"], gh["repo"]) == ("o", "r")
+
+
+def test_normalize_hf_legacy_and_dataset_ids():
+    assert normalize_resource({"url": "https://huggingface.co/gpt2"})["hf_repo_id"] == "gpt2"
+    dataset = normalize_resource({"url": "https://huggingface.co/datasets/org/data"})
+    assert dataset["hf_repo_id"] == "datasets/org/data"
+
+
+def test_normalize_url_without_repo():
+    assert normalize_resource({"url": "https://huggingface.co/"})["hf_repo_id"] == ""
+    gh = normalize_resource({"url": "https://github.com/"})
+    assert (gh["kind"], gh["owner"], gh["repo"]) == ("github", "", "")
+
+
+def test_resource_ref_from_dict():
+    ref = ResourceRef.from_dict({"category": "model", "url": "https://huggingface.co/org/m", "name": "m"})
+    assert ref == ResourceRef(category="MODEL", url="https://huggingface.co/org/m", name="m", hf_repo_id="org/m")
+    assert ResourceRef.from_dict({"url": "https://github.com/o/r"}).hf_repo_id == ""
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        ref.category = "CODE"
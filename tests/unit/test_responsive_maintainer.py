@@ -2,7 +2,17 @@
 """Tests for responsive_maintainer metric."""
 from unittest.mock import MagicMock
 
-from src.metrics.responsive_maintainer import metric
+import pytest
+
+from src.metrics.responsive_maintainer import _avg_close_time, metric
+
+
+@pytest.fixture(autouse=True)
+def clear_issue_cache():
+    """Each test mocks its own GitHub response for the same repo names."""
+    _avg_close_time.cache_clear()
+    yield
+    _avg_close_time.cache_clear()
 
 
 def test_responsive_maintainer_no_path():
@@ -28,7 +38,7 @@ def test_responsive_maintainer_empty_resource():
 
 def test_github_repo_success(mocker):
     """Test with valid GitHub repo."""
-    mock_requests = mocker.patch("requests.get")
+    mock_requests = mocker.patch("src.utils.http_session.SESSION.get")
     mock_requests.return_value.status_code = 200
     mock_requests.return_value.json.return_value = [
         {"created_at": "2023-01-01T00:00:00Z", "closed_at": "2023-01-02T00:00:00Z"},
@@ -42,6 +52,21 @@ def test_github_repo_success(mocker):
     assert latency >= 0
 
 
+def test_github_average_close_time_interpolates(mocker):
+    """Average of 11 and 26 days sits halfway between one week and 30 days; PRs are skipped."""
+    mock_get = mocker.patch("src.utils.http_session.SESSION.get")
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.headers = {}
+    mock_get.return_value.json.return_value = [
+        {"created_at": "2023-01-01T00:00:00Z", "closed_at": "2023-01-12T00:00:00Z"},
+        {"created_at": "2023-02-01T00:00:00Z", "closed_at": "2023-02-27T00:00:00Z"},
+        {"pull_request": {}, "created_at": "2023-03-01T00:00:00Z", "closed_at": "2023-03-01T00:00:01Z"},
+    ]
+
+    score, _ = metric({"url": "https://github.com/test/repo"})
+    assert score == 0.5
+
+
 def test_huggingface_model_success(mocker):
     """Test with valid HuggingFace model."""
     mock_metadata = MagicMock()
@@ -82,3 +107,20 @@ def test_responsive_maintainer_huggingface():
     
     assert isinstance(score, int | float)
     assert latency >= 0
+
+
+def test_github_issue_stats_cached_per_repo(mocker):
+    """A second rating of the same repo reuses the issue stats; errors aren't cached."""
+    mock_get = mocker.patch("src.utils.http_session.SESSION.get")
+    mock_get.return_value.status_code = 503
+    mock_get.return_value.headers = {}
+    resource = {"url": "https://github.com/test/cached"}
+
+    assert metric(dict(resource))[0] == 0.5
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = [
+        {"created_at": "2023-01-01T00:00:00Z", "closed_at": "2023-01-02T00:00:00Z"},
+    ]
+    assert metric(dict(resource))[0] == 1.0
+    assert metric(dict(resource))[0] == 1.0
+    assert mock_get.call_count == 2
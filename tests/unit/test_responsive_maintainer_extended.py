@@ -3,7 +3,17 @@
 from datetime import UTC, datetime, timedelta
 from unittest.mock import MagicMock
 
-from src.metrics.responsive_maintainer import metric
+import pytest
+
+from src.metrics.responsive_maintainer import _avg_close_time, _staleness_score, metric
+
+
+@pytest.fixture(autouse=True)
+def clear_issue_cache():
+    """Each test mocks its own GitHub response for the same repo names."""
+    _avg_close_time.cache_clear()
+    yield
+    _avg_close_time.cache_clear()
 
 
 def test_responsive_maintainer_github_success(mocker):
@@ -18,7 +28,7 @@ def test_responsive_maintainer_github_success(mocker):
         "closed_at": now.isoformat()
     }]
     
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("src.utils.http_session.SESSION.get", return_value=mock_response)
     
     resource = {
         "url": "https://github.com/test/repo",
@@ -37,7 +47,7 @@ def test_responsive_maintainer_github_no_issues(mocker):
     mock_response.status_code = 200
     mock_response.json.return_value = []
     
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("src.utils.http_session.SESSION.get", return_value=mock_response)
     
     resource = {
         "url": "https://github.com/owner/repo",
@@ -56,7 +66,7 @@ def test_responsive_maintainer_github_api_error(mocker):
     mock_response = MagicMock()
     mock_response.status_code = 403
     
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("src.utils.http_session.SESSION.get", return_value=mock_response)
     
     resource = {
         "url": "https://github.com/owner/repo",
@@ -124,3 +134,11 @@ def test_responsive_maintainer_unknown_url():
     # Default for unknown
     assert score == 0.5
     assert latency >= 0
+
+
+@pytest.mark.parametrize("days, expected", [
+    (0, 0.9), (29, 0.9), (30, 0.7), (89, 0.7), (90, 0.5), (180, 0.3), (364, 0.3), (365, 0.1),
+])
+def test_responsive_maintainer_huggingface_staleness_tiers(days, expected):
+    """Each staleness bound is exclusive: exactly 30 days old drops to the next tier."""
+    assert _staleness_score(days) == expected
@@ -2,7 +2,12 @@
 """Security-focused route tests."""
 from fastapi.testclient import TestClient
 
-from src.api.routes import ALLOWED_URL_DOMAINS, validate_auth_token, validate_url_domain
+from src.api.routes import (
+    ALLOWED_URL_DOMAINS,
+    VALID_AUTH_TOKENS,
+    validate_auth_token,
+    validate_url_domain,
+)
 from src.main import app
 
 client = TestClient(app)
@@ -48,6 +53,12 @@ def test_validate_auth_token_empty():
     assert validate_auth_token("") is False
 
 
+def test_auth_tokens_have_no_empty_entry():
+    """An unset AUTH_TOKEN env var must not register an empty token."""
+    assert "" not in VALID_AUTH_TOKENS
+    assert isinstance(VALID_AUTH_TOKENS, frozenset)
+
+
 def test_validate_auth_token_valid_admin():
     """Test valid admin token."""
     assert validate_auth_token("bearer admin") is True
@@ -93,3 +104,21 @@ def test_regex_search_length_limit():
     response = client.post("/package/byRegEx", json={"RegEx": "a" * 600})
     assert response.status_code == 200
     assert response.json() == []
+
+
+def test_validate_url_domain_checks_host_not_substring():
+    """Allowed domain names elsewhere in the URL must not pass."""
+    assert validate_url_domain("https://evil.com/?x=github.com") is False
+    assert validate_url_domain("https://github.com.evil.com/repo") is False
+    assert validate_url_domain("https://www.github.com/user/repo") is True
+    assert validate_url_domain("https://HuggingFace.co/user/model") is True
+
+
+def test_validate_url_domain_memoizes_repeat_urls():
+    """Re-validating the same URL is served from the LRU cache."""
+    validate_url_domain.cache_clear()
+    url = "https://huggingface.co/owner/model"
+    assert validate_url_domain(url) is True
+    assert validate_url_domain(url) is True
+    info = validate_url_domain.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
@@ -1,10 +1,28 @@
 # tests/unit/test_size_extended.py
 """Extended tests for size metric."""
+from collections.abc import Mapping
 from unittest.mock import MagicMock
 
+import pytest
+import requests
+
+from src.metrics import size
 from src.metrics.size import get_model_size_via_http, metric, normalize
 
 
+@pytest.fixture(autouse=True)
+def isolated_size_cache(tmp_path, mocker):
+    """Point the persistent size cache at a per-test file, with an empty memory layer.
+    The slim safetensors request finds nothing, so lookups use the (mocked) model_info."""
+    mocker.patch.object(size, "SIZE_CACHE_PATH", str(tmp_path / "size_cache.sqlite"))
+    mocker.patch.object(size, "_safetensors_total", return_value=0)
+    size._size_cache.clear()
+    size._missing_models.clear()
+    yield
+    size._size_cache.clear()
+    size._missing_models.clear()
+
+
 def test_normalize_small():
     """Test normalize with small values."""
     assert normalize(0.0, 0.0, 10.0) == 1.0
@@ -29,7 +47,7 @@ def test_metric_non_model():
     
     scores, latency = metric(resource)
     
-    assert isinstance(scores, dict)
+    assert isinstance(scores, Mapping)
     assert all(v == 0.0 for v in scores.values())
     assert latency >= 0
 
@@ -40,7 +58,7 @@ def test_metric_no_url():
     
     scores, latency = metric(resource)
     
-    assert isinstance(scores, dict)
+    assert scores is size._ZERO_SCORES
     assert all(v == 0.0 for v in scores.values())
 
 
@@ -50,7 +68,7 @@ def test_metric_non_hf_url():
     
     scores, latency = metric(resource)
     
-    assert isinstance(scores, dict)
+    assert scores is size._ZERO_SCORES
     assert all(v == 0.0 for v in scores.values())
 
 
@@ -73,8 +91,229 @@ def test_metric_hf_url(mocker):
     assert "aws_server" in scores
 
 
-def test_get_model_size_via_http_no_files():
+def test_get_model_size_via_http_no_files(mocker):
     """Test HTTP fallback with no model files."""
+    mocker.patch("src.utils.http_session.SESSION.head", side_effect=ConnectionError("offline"))
     result = get_model_size_via_http("test/model", [])
     
     assert isinstance(result, int)
+
+
+def test_model_size_cached_in_memory_and_on_disk(mocker):
+    """A repeat lookup skips model_info, and so does a fresh process sharing the file."""
+    info = MagicMock()
+    info.safetensors = MagicMock(total=2 * 1024 ** 3)
+    fetch = mocker.patch("src.metrics.size.model_info", return_value=info)
+    resource = {"category": "MODEL", "url": "https://huggingface.co/org/big"}
+
+    first, _ = metric(resource)
+    assert metric(resource)[0] == first
+    assert fetch.call_count == 1
+
+    size._size_cache.clear()  # as if a new process
+    assert metric(resource)[0] == first
+    assert fetch.call_count == 1
+    assert first["raspberry_pi"] == 0.5
+
+
+def test_model_size_zero_and_errors_not_cached(mocker):
+    """Sizes the Hub didn't report, and Hub failures, are retried next time."""
+    info = MagicMock()
+    info.safetensors = None
+    info.siblings = []
+    fetch = mocker.patch("src.metrics.size.model_info", return_value=info)
+    resource = {"category": "MODEL", "url": "https://huggingface.co/org/unknown"}
+
+    metric(resource)
+    metric(resource)
+    assert fetch.call_count == 2
+
+    fetch.side_effect = requests.ConnectionError("hub down")
+    scores, _ = metric(resource)
+    assert all(v == 0.0 for v in scores.values())
+
+
+def test_model_size_programming_errors_propagate(mocker):
+    """Only Hub and network failures score zero; bugs aren't swallowed."""
+    mocker.patch("src.metrics.size.model_info", side_effect=TypeError("bug"))
+    with pytest.raises(TypeError):
+        metric({"category": "MODEL", "url": "https://huggingface.co/org/m"})
+
+
+def test_model_size_disk_entries_expire(mocker):
+    info = MagicMock()
+    info.safetensors = MagicMock(total=1024 ** 3)
+    fetch = mocker.patch("src.metrics.size.model_info", return_value=info)
+    assert size._cached_model_size("org/m") == 1024 ** 3
+
+    size._size_cache.clear()
+    mocker.patch("src.metrics.size.time.time", return_value=size.time.time() + size.SIZE_CACHE_TTL + 1)
+    assert size._cached_model_size("org/m") == 1024 ** 3
+    assert fetch.call_count == 2
+
+
+def test_get_model_size_via_http_uses_shared_session(mocker):
+    """HEAD requests go through the pooled session and sum Content-Length."""
+    head = mocker.patch("src.utils.http_session.SESSION.head")
+    head.return_value.status_code = 200
+    head.return_value.headers = {"Content-Length": "1000"}
+    siblings = [MagicMock(rfilename="model.safetensors"), MagicMock(rfilename="README.md")]
+
+    assert get_model_size_via_http("org/m", siblings) == 1000
+    head.assert_called_once_with(
+        "https://huggingface.co/org/m/resolve/main/model.safetensors", allow_redirects=True, timeout=5
+    )
+
+
+def test_metric_batch_preserves_order(mocker):
+    def fake_size(model_id):
+        return {"org/small": 1024 ** 3, "org/large": 200 * 1024 ** 3}[model_id]
+
+    mocker.patch("src.metrics.size._fetch_model_size", side_effect=fake_size)
+    resources = [
+        {"category": "MODEL", "url": "https://huggingface.co/org/large"},
+        {"category": "CODE", "url": "https://github.com/o/r"},
+        {"category": "MODEL", "url": "https://huggingface.co/org/small"},
+    ]
+
+    results = size.metric_batch(resources, max_workers=4)
+    assert [scores["aws_server"] for scores, _ in results] == [0.0, 0.0, 0.99]
+    assert size.metric_batch([]) == []
+
+
+@pytest.mark.parametrize("size_gb", [0.5, 4.0, 7.9, 31.0, 64.0, 150.0])
+def test_metric_scores_match_normalize(mocker, size_gb):
+    """The clamped per-hardware scores equal normalize() against each limit."""
+    mocker.patch("src.metrics.size._fetch_model_size", return_value=int(size_gb * 1024 ** 3))
+    scores, _ = metric({"category": "MODEL", "url": "https://huggingface.co/org/m"})
+    exact_gb = int(size_gb * 1024 ** 3) / 1024 ** 3
+    for name, limit in (("raspberry_pi", 4.0), ("jetson_nano", 8.0), ("desktop_pc", 32.0), ("aws_server", 100.0)):
+        assert scores[name] == pytest.approx(normalize(exact_gb, 0.0, limit))
+
+
+def test_fetch_model_size_falls_back_to_sibling_sizes(mocker):
+    """Without safetensors totals, sizes of siblings that report one are summed."""
+    info = MagicMock()
+    info.safetensors = None
+    info.siblings = [MagicMock(size=300), MagicMock(size=None), MagicMock(size=700)]
+    mocker.patch("src.metrics.size.model_info", return_value=info)
+    head = mocker.patch("src.metrics.size.get_model_size_via_http")
+
+    assert size._fetch_model_size("org/m") == 1000
+    head.assert_not_called()
+
+    class Bare:  # neither attribute present
+        pass
+
+    mocker.patch("src.metrics.size.model_info", return_value=Bare())
+    assert size._fetch_model_size("org/m") == 0
+    head.assert_not_called()
+
+
+def test_fetch_model_size_prefers_slim_request(mocker):
+    """A safetensors total from the slim request skips the full model_info fetch."""
+    mocker.patch.object(size, "_safetensors_total", return_value=4096)
+    full = mocker.patch("src.metrics.size.model_info")
+    assert size._fetch_model_size("org/slim") == 4096
+    full.assert_not_called()
+
+
+def test_fetch_model_size_reuses_already_cached_model_info(mocker):
+    """When another metric already holds the full record, no request is made at all."""
+    from src.utils import hf_hub
+
+    info = MagicMock()
+    info.safetensors = MagicMock(total=123)
+    hf_hub.model_info.cache[("org/shared",)] = info
+    slim = mocker.patch.object(size, "_safetensors_total")
+    try:
+        assert size._fetch_model_size("org/shared") == 123
+        slim.assert_not_called()
+    finally:
+        hf_hub.model_info.cache.pop(("org/shared",))
+
+
+def test_safetensors_total_requests_only_that_field(mocker):
+    mocker.stopall()  # undo the autouse stub of _safetensors_total
+    hub = mocker.patch("src.metrics.size._hub_model_info")
+    hub.return_value.safetensors = MagicMock(total=77)
+    assert size._safetensors_total("org/m") == 77
+    hub.assert_called_once_with("org/m", expand=["safetensors"])
+
+
+def test_metric_non_model_returns_shared_read_only_zeros():
+    """Non-models skip all work and share one immutable result."""
+    first, latency = metric({"category": "dataset"})
+    second, _ = metric({"category": "CODE"})
+    assert first is second
+    assert latency == 0
+    assert dict(first) == dict.fromkeys(["raspberry_pi", "jetson_nano", "desktop_pc", "aws_server"], 0.0)
+    with pytest.raises(TypeError):
+        first["raspberry_pi"] = 1.0
+
+
+def test_metric_ref_matches_metric(mocker):
+    from src.utils.resource import ResourceRef
+
+    mocker.patch("src.metrics.size._fetch_model_size", return_value=2 * 1024 ** 3)
+    resource = {"category": "model", "url": "https://huggingface.co/org/m"}
+    assert size.metric_ref(ResourceRef.from_dict(dict(resource)))[0] == metric(resource)[0]
+    assert size.metric_ref(ResourceRef(category="MODEL"))[0] is size._ZERO_SCORES
+
+
+def test_metric_batch_scores_columns_match_metric(mocker):
+    """Each column holds the same values metric() returns, in input order."""
+    sizes = {"org/small": 1024 ** 3, "org/large": 50 * 1024 ** 3, "org/unknown": 0}
+    mocker.patch("src.metrics.size._fetch_model_size", side_effect=sizes.__getitem__)
+    resources = [
+        {"category": "MODEL", "url": "https://huggingface.co/org/large"},
+        {"category": "CODE", "url": "https://github.com/o/r"},
+        {"category": "MODEL", "url": "https://huggingface.co/org/unknown"},
+        {"category": "MODEL", "url": "https://huggingface.co/org/small"},
+    ]
+
+    columns, latencies = size.metric_batch_scores([dict(r) for r in resources], max_workers=2)
+    expected = [metric(dict(r))[0] for r in resources]
+    for name in ("raspberry_pi", "jetson_nano", "desktop_pc", "aws_server"):
+        assert list(columns[name]) == [scores[name] for scores in expected]
+    assert len(latencies) == 4
+
+    columns, latencies = size.metric_batch_scores([])
+    assert all(len(col) == 0 for col in columns.values()) and len(latencies) == 0
+
+
+def test_missing_model_not_refetched(mocker):
+    """A repo the Hub says doesn't exist is remembered; other errors aren't."""
+    from huggingface_hub.utils import RepositoryNotFoundError
+
+    not_found = RepositoryNotFoundError("404", response=MagicMock(status_code=404))
+    fetch = mocker.patch("src.metrics.size.model_info", side_effect=not_found)
+    resource = {"category": "MODEL", "url": "https://huggingface.co/org/typo"}
+
+    for _ in range(3):
+        scores, _ = metric(dict(resource))
+        assert all(v == 0.0 for v in scores.values())
+    assert fetch.call_count == 1
+
+    size._missing_models.clear()
+    metric(dict(resource))
+    assert fetch.call_count == 2
+
+
+def test_metric_stream_jsonl_round_trip(mocker, tmp_path):
+    import json
+
+    mocker.patch("src.metrics.size._fetch_model_size", return_value=2 * 1024 ** 3)
+    in_path, out_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    resources = [
+        {"category": "MODEL", "url": "https://huggingface.co/org/a", "name": "a"},
+        {"category": "CODE", "url": "https://github.com/o/r"},
+        {"category": "MODEL", "url": "https://huggingface.co/org/c", "name": "c"},
+    ]
+    in_path.write_text("\n".join(json.dumps(r) for r in resources) + "\n\n")
+
+    assert size.metric_stream(str(in_path), str(out_path), concurrency=2, chunk_size=2) == 3
+    rows = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert [r["custom_id"] for r in rows] == ["a", "https://github.com/o/r", "c"]
+    assert rows[0]["scores"]["raspberry_pi"] == 0.5
+    assert rows[1]["scores"] == dict(size._ZERO_SCORES)
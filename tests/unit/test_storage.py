@@ -94,6 +94,17 @@ def test_list_packages_pagination(storage):
     result = storage.list_packages(limit=5)
     assert len(result) == 5
 
+    # Cursor resumes after the given id
+    result = storage.list_packages(limit=3, cursor="id-11")
+    assert [m.id for m in result] == ["id-12", "id-13", "id-14"]
+    assert storage.list_packages(cursor="missing") == []
+
+    # Pages are in id order and a deleted cursor still resumes after it
+    assert [m.id for m in storage.list_packages(limit=3)] == ["id-0", "id-1", "id-10"]
+    storage.delete_package("id-11")
+    result = storage.list_packages(limit=2, cursor="id-11")
+    assert [m.id for m in result] == ["id-12", "id-13"]
+
 
 def test_search_by_regex_case_insensitive(storage, sample_package):
     """Test regex search is case insensitive."""
@@ -139,8 +150,39 @@ def test_search_by_regex_length_limit(storage, sample_package):
     assert result == []
 
 
+def test_search_by_regex_trigram_prefilter(storage):
+    """Literal regexes only match packages whose name or readme holds them."""
+    for pid, name, readme in [("a", "alpha", "# Uses BERT"), ("b", "beta", "# bert-free"), ("c", "gamma", None)]:
+        storage.add_package(Package(
+            metadata=PackageMetadata(name=name, version="1.0.0", id=pid),
+            data=PackageData(content="x", readme=readme)
+        ))
+    assert [m.id for m in storage.search_by_regex("bert")] == ["a", "b"]
+    assert [m.id for m in storage.search_by_regex("bert-f.*")] == ["b"]
+    assert [m.id for m in storage.search_by_regex("^gam")] == ["c"]
+
+    storage.delete_package("a")
+    assert [m.id for m in storage.search_by_regex("bert")] == ["b"]
+    assert "use" not in storage._trigram_index
+
+
 def test_delete_package_nonexistent(storage):
     """Test deleting non-existent package returns False."""
     result = storage.delete_package("nonexistent-id")
     assert result is False
 
+
+
+def test_find_by_name(storage):
+    """Name index resolves full and owner-less names and tracks deletes."""
+    pkg = Package(
+        metadata=PackageMetadata(name="Google/Bert-Base", version="1.0.0", id="bert-id"),
+        data=PackageData(content="x")
+    )
+    storage.add_package(pkg)
+    assert storage.find_by_name("google/bert-base").id == "bert-id"
+    assert storage.find_by_name("BERT-BASE").id == "bert-id"
+    assert storage.find_by_name("bert") is None
+
+    storage.delete_package("bert-id")
+    assert storage.find_by_name("bert-base") is None
@@ -1,18 +1,21 @@
 # tests/unit/test_storage_s3_simple.py
 """Simplified S3 tests for coverage."""
+from io import BytesIO
 from unittest.mock import MagicMock
 
 import pytest
 
 from src.api.models import Package, PackageData, PackageMetadata
-from src.services.storage import S3Storage
+from src.services.storage import S3Storage, _s3_client
 
 
 @pytest.fixture
 def mock_s3_client(mocker):
     mock = MagicMock()
     mocker.patch("boto3.client", return_value=mock)
-    return mock
+    _s3_client.cache_clear()
+    yield mock
+    _s3_client.cache_clear()
 
 @pytest.fixture
 def s3_storage(mock_s3_client):
@@ -52,3 +55,114 @@ def test_s3_coverage_search(s3_storage, mock_s3_client):
         s3_storage.search_by_regex("reg")
     except Exception:
         pass
+
+
+def test_s3_exists_uses_head(s3_storage, mock_s3_client):
+    from botocore.exceptions import ClientError
+
+    assert s3_storage.exists("i") is True
+    mock_s3_client.head_object.assert_called_once()
+    mock_s3_client.get_object.assert_not_called()
+
+    mock_s3_client.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+    assert s3_storage.exists("missing") is False
+
+def test_s3_delete_rating(s3_storage, mock_s3_client):
+    assert s3_storage.delete_rating("i") is True
+    mock_s3_client.delete_object.assert_called_once_with(Bucket="bucket", Key="packages/i/rating.json")
+
+    mock_s3_client.delete_object.side_effect = Exception("boom")
+    assert s3_storage.delete_rating("i") is False
+
+def test_s3_bulk_add_puts_every_package(s3_storage, mock_s3_client):
+    pkgs = [
+        Package(metadata=PackageMetadata(name=f"n{i}", version="1", id=f"i{i}"), data=PackageData())
+        for i in range(25)
+    ]
+    s3_storage.bulk_add_packages(pkgs)
+    keys = {c.kwargs["Key"] for c in mock_s3_client.put_object.call_args_list}
+    assert {f"packages/i{i}/full.json" for i in range(25)} <= keys
+
+    mock_s3_client.put_object.side_effect = RuntimeError("denied")
+    with pytest.raises(RuntimeError):
+        s3_storage.bulk_add_packages(pkgs[:2])
+
+def test_s3_list_cursor_starts_after_prefix(s3_storage, mock_s3_client):
+    paginator = MagicMock()
+    mock_s3_client.get_paginator.return_value = paginator
+    paginator.paginate.return_value = []
+    s3_storage.list_packages(cursor="abc")
+    start_after = paginator.paginate.call_args.kwargs["StartAfter"]
+    # Past every key under the cursor's prefix, before the next package's
+    assert "packages/abc/full.json" < start_after < "packages/abd/"
+    assert "packages/abc0/" > start_after
+
+def test_s3_list_reads_metadata_from_flat_listing(s3_storage, mock_s3_client):
+    paginator = MagicMock()
+    mock_s3_client.get_paginator.return_value = paginator
+    # One package's keys straddle a page boundary
+    paginator.paginate.return_value = [
+        {"Contents": [{"Key": "packages/a/full.json"}, {"Key": "packages/a/metadata.json"},
+                      {"Key": "packages/b/content.zip"}]},
+        {"Contents": [{"Key": "packages/b/full.json"}, {"Key": "packages/b/metadata.json"}]},
+    ]
+
+    def get_object(Bucket, Key):
+        pid = Key.split("/")[1]
+        assert Key.endswith("/metadata.json")  # never the full package
+        body = PackageMetadata(name=f"n-{pid}", version="1", id=pid).model_dump_json()
+        return {"Body": MagicMock(read=MagicMock(return_value=body.encode()))}
+
+    mock_s3_client.get_object.side_effect = get_object
+    assert [m.id for m in s3_storage.list_packages(limit=10)] == ["a", "b"]
+    assert "Delimiter" not in paginator.paginate.call_args.kwargs
+
+def test_s3_list_uses_index_markers(s3_storage, mock_s3_client):
+    from botocore.exceptions import ClientError
+
+    meta = PackageMetadata(name="org/my model", version="1.0", id="m1", type="model")
+    # Fresh insert: just the marker PUT, no listing or cleanup
+    mock_s3_client.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+    s3_storage.add_package(Package(metadata=meta, data=PackageData()))
+    marker = mock_s3_client.put_object.call_args.kwargs["Key"]
+    assert marker == "packages/m1/index/org%2Fmy%20model/1.0/model"
+    mock_s3_client.list_objects_v2.assert_not_called()
+    mock_s3_client.delete_object.assert_not_called()
+
+    # Overwrite of a different version drops the old marker
+    old = PackageMetadata(name="old", version="1", id="m1", type="code")
+    mock_s3_client.get_object.side_effect = None
+    mock_s3_client.get_object.return_value = {"Body": BytesIO(old.model_dump_json().encode())}
+    s3_storage.add_package(Package(metadata=meta, data=PackageData()))
+    mock_s3_client.delete_object.assert_called_once_with(Bucket="bucket", Key="packages/m1/index/old/1/code")
+    mock_s3_client.list_objects_v2.assert_not_called()
+
+    paginator = MagicMock()
+    mock_s3_client.get_paginator.return_value = paginator
+    paginator.paginate.return_value = [{"Contents": [{"Key": "packages/m1/full.json"}, {"Key": marker},
+                                                     {"Key": "packages/m1/metadata.json"}]}]
+    mock_s3_client.get_object.side_effect = AssertionError("listing should be enough")
+    assert s3_storage.list_packages() == [meta]
+
+def test_s3_download_url_checks_existence_with_head(s3_storage, mock_s3_client):
+    mock_s3_client.generate_presigned_url.return_value = "https://signed"
+    assert s3_storage.get_download_url("i") == "https://signed"
+    mock_s3_client.head_object.assert_called_once_with(Bucket="bucket", Key="packages/i/full.json")
+    mock_s3_client.get_object.assert_not_called()
+
+
+def test_s3_client_shared_per_region(mock_s3_client):
+    assert S3Storage("a", "region").s3 is S3Storage("b", "region").s3
+
+def test_s3_legacy_full_zip_package_exists_and_has_download_url(s3_storage, mock_s3_client):
+    from botocore.exceptions import ClientError
+
+    def head_object(Bucket, Key):
+        if Key != "packages/old/full.zip":
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    mock_s3_client.head_object.side_effect = head_object
+    mock_s3_client.generate_presigned_url.return_value = "https://signed"
+    assert s3_storage.exists("old") is True
+    assert s3_storage.get_download_url("old") == "https://signed"
@@ -30,6 +30,16 @@ def test_sqlite_add_get(sqlite_store, sample_package):
     assert retrieved.metadata.name == "TestPkg"
     assert retrieved.data.content == "base64enc"
 
+def test_sqlite_exists(sqlite_store, sample_package):
+    assert sqlite_store.exists("test-1") is False
+    sqlite_store.add_package(sample_package)
+    assert sqlite_store.exists("test-1") is True
+
+def test_sqlite_get_package_content(sqlite_store, sample_package):
+    assert sqlite_store.get_package_content("test-1") is None
+    sqlite_store.add_package(sample_package)
+    assert sqlite_store.get_package_content("test-1") == "base64enc"
+
 def test_sqlite_list(sqlite_store, sample_package):
     sqlite_store.add_package(sample_package)
     res = sqlite_store.list_packages()
@@ -79,3 +89,153 @@ def test_cached_storage(sqlite_store, sample_package):
     cached.delete_package("test-1")
     p3 = cached.get_package("test-1")
     assert p3 is None
+
+def test_sqlite_bulk_add(sqlite_store):
+    pkgs = [
+        Package(
+            metadata=PackageMetadata(name=f"Bulk-{i}", version="1.0.0", id=f"bulk-{i}"),
+            data=PackageData(content="x", readme="# Bulk")
+        )
+        for i in range(25)
+    ]
+    sqlite_store.bulk_add_packages(pkgs)
+    assert sqlite_store.get_package("bulk-24").metadata.name == "Bulk-24"
+    assert len(sqlite_store.list_packages(limit=100)) == 25
+
+def test_sqlite_uses_wal(sqlite_store):
+    conn = sqlite_store._connect()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 268435456
+
+def test_sqlite_concurrent_pooled_reads(tmp_path, sample_package):
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = SQLiteStorage(db_path=str(tmp_path / "pool.db"), read_pool_size=2)
+    store.add_package(sample_package)
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        results = list(ex.map(lambda _: store.get_package("test-1"), range(32)))
+    assert all(r.metadata.id == "test-1" for r in results)
+    # Every borrowed connection went back to the pool
+    assert store._read_pool.qsize() == 2
+
+def test_cached_storage_is_bounded(sqlite_store):
+    cached = CachedStorage(sqlite_store, maxsize=8)  # one slot per shard
+    for i in range(50):
+        cached.add_package(Package(
+            metadata=PackageMetadata(name=f"P{i}", version="1.0.0", id=f"p-{i}"),
+            data=PackageData(content="x")
+        ))
+    assert sum(len(s) for s in cached._shards) <= 8
+    # Evicted entries still come back from the wrapped store
+    assert cached.get_package("p-0").metadata.name == "P0"
+
+def test_cached_storage_content_miss_fills_cache(sqlite_store, sample_package):
+    sqlite_store.add_package(sample_package)
+    cached = CachedStorage(sqlite_store)
+    assert cached.get_package_content("test-1") == "base64enc"
+    # Second read is served from the LRU, not the backend
+    sqlite_store.delete_package("test-1")
+    assert cached.get_package_content("test-1") == "base64enc"
+    assert cached.get_package_content("absent") is None
+
+def test_sqlite_find_by_name(sqlite_store, sample_package):
+    assert sqlite_store.find_by_name("testpkg") is None
+    sqlite_store.add_package(sample_package)
+    sqlite_store.add_package(Package(
+        metadata=PackageMetadata(name="owner/Model_1", version="1.0.0", id="m-1"),
+        data=PackageData(content="x")
+    ))
+    assert sqlite_store.find_by_name("TESTPKG").id == "test-1"
+    assert sqlite_store.find_by_name("model_1").id == "m-1"
+    assert sqlite_store.find_by_name("owner/model_1").id == "m-1"
+    # LIKE wildcards in the lookup are matched literally
+    assert sqlite_store.find_by_name("model%") is None
+
+def test_sqlite_list_filters_and_pages(sqlite_store):
+    from src.api.models import PackageQuery
+
+    for i, (name, version, kind) in enumerate([
+        ("a", "1.0.0", "code"), ("a", "2.0.0", "model"), ("b", "1.0.0", "dataset"), ("c", "1.0.0", "code"),
+    ]):
+        sqlite_store.add_package(Package(
+            metadata=PackageMetadata(name=name, version=version, id=f"id-{i}", type=kind),
+            data=PackageData(content="x")
+        ))
+
+    def ids(queries=None, **kw):
+        return [m.id for m in sqlite_store.list_packages(queries, **kw)]
+
+    assert ids() == ["id-0", "id-1", "id-2", "id-3"]
+    assert ids([PackageQuery(name="a")]) == ["id-0", "id-1"]
+    assert ids([PackageQuery(name="a", version="2.0.0")]) == ["id-1"]
+    assert ids([PackageQuery(name="*", types=["CODE"])]) == ["id-0", "id-3"]
+    assert ids([PackageQuery(name="b"), PackageQuery(name="c")]) == ["id-2", "id-3"]
+    assert ids([PackageQuery(name="*")], offset=1, limit=2) == ["id-1", "id-2"]
+    assert ids([PackageQuery(name="zzz")]) == []
+    assert ids([PackageQuery(name="*")], cursor="id-1") == ["id-2", "id-3"]
+    assert ids([PackageQuery(name="*", types=["code"])], cursor="id-0") == ["id-3"]
+    assert ids(cursor="missing") == []
+    # A cursor whose package was deleted still resumes after it
+    sqlite_store.delete_package("id-1")
+    assert ids([PackageQuery(name="*")], cursor="id-1") == ["id-2", "id-3"]
+
+
+def test_sqlite_search_regex_uses_trigram_index(sqlite_store):
+    for pid, name, readme in [("a", "alpha", "# Uses BERT"), ("b", "beta", "# bert-free"), ("c", "gamma", None)]:
+        sqlite_store.add_package(Package(
+            metadata=PackageMetadata(name=name, version="1.0.0", id=pid),
+            data=PackageData(content="x", readme=readme)
+        ))
+    assert [m.id for m in sqlite_store.search_by_regex("bert")] == ["a", "b"]
+    assert [m.id for m in sqlite_store.search_by_regex("bert-f.*")] == ["b"]
+    assert [m.id for m in sqlite_store.search_by_regex("a|b")] == ["a", "b", "c"]
+
+    sqlite_store.delete_package("a")
+    assert [m.id for m in sqlite_store.search_by_regex("bert")] == ["b"]
+    with sqlite_store._reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trigrams WHERE pkg_id = 'a'").fetchone()[0] == 0
+
+
+def test_sqlite_backfills_trigrams_for_old_databases(tmp_path, sample_package):
+    db = str(tmp_path / "old.db")
+    store = SQLiteStorage(db_path=db)
+    store.add_package(sample_package)
+    with store._writer() as conn:
+        conn.execute("DELETE FROM trigrams")
+        conn.execute("PRAGMA user_version = 0")
+
+    reopened = SQLiteStorage(db_path=db)
+    assert [m.id for m in reopened.search_by_regex("readme")] == ["test-1"]
+
+def test_cached_storage_negative_cache(sqlite_store, sample_package, mocker):
+    cached = CachedStorage(sqlite_store)
+    spy = mocker.spy(sqlite_store, "get_package")
+    assert cached.get_package("test-1") is None
+    assert cached.get_package("test-1") is None
+    assert cached.exists("test-1") is False
+    assert spy.call_count == 1
+
+    # Writes through the wrapper clear the remembered miss
+    cached.add_package(sample_package)
+    assert cached.get_package("test-1").metadata.id == "test-1"
+
+def test_cached_storage_single_flight(sqlite_store, sample_package, mocker):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    sqlite_store.add_package(sample_package)
+    cached = CachedStorage(sqlite_store)
+    release = threading.Event()
+    real_get = sqlite_store.get_package
+
+    def slow_get(pid):
+        release.wait(5)
+        return real_get(pid)
+
+    backend = mocker.patch.object(sqlite_store, "get_package", side_effect=slow_get)
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = [ex.submit(cached.get_package, "test-1") for _ in range(8)]
+        release.set()
+        assert all(f.result().metadata.id == "test-1" for f in futures)
+    assert backend.call_count == 1
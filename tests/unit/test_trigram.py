@@ -0,0 +1,56 @@
+# tests/unit/test_trigram.py
+"""Tests for the regex-search trigram prefilter."""
+import re
+
+import pytest
+
+from src.utils.trigram import compile_search, literal_alternatives, required_trigrams, trigrams
+
+
+def test_trigrams_are_case_folded():
+    assert trigrams("BeRt") == {"ber", "ert"}
+    assert trigrams("ab") == set()
+    assert trigrams(None) == set()
+
+
+def test_trigrams_fold_non_ascii_ignorecase_matches():
+    # re.IGNORECASE matches "install" against "İnstall"; the trigrams must agree
+    assert re.search("install", "İnstall", re.IGNORECASE)
+    assert required_trigrams("install") <= trigrams("İnstall")
+
+
+@pytest.mark.parametrize("regex, expected", [
+    ("Read.*", {"rea", "ead"}),
+    ("(abc|def)ghi", {"ghi"}),
+    ("x(abcd)+y", {"abc", "bcd"}),
+    ("a?bcd", {"bcd"}),
+    ("[ab]cde", {"cde"}),
+    ("ab(cd)?", set()),
+    (".*", set()),
+])
+def test_required_trigrams(regex, expected):
+    assert required_trigrams(regex) == expected
+
+
+def test_required_trigrams_invalid_regex():
+    with pytest.raises(re.error):
+        required_trigrams("[invalid")
+
+
+@pytest.mark.parametrize("regex, expected", [
+    ("bert", ("bert",)),
+    ("BERT|GPT-2", ("bert", "gpt-2")),
+    ("(?:foo|bar)", ("foo", "bar")),
+    ("ber.t", None),
+    ("(?a)bert", None),
+    ("(?-i:bert)", None),
+])
+def test_literal_alternatives(regex, expected):
+    assert literal_alternatives(regex) == expected
+
+
+@pytest.mark.parametrize("regex", ["bert|gpt", "install", "BERT", "(a+)+$", "^alpha"])
+@pytest.mark.parametrize("text", ["Uses BERT", "İnstall it", "gpT-2", "alpha aaaa", "nothing"])
+def test_compile_search_agrees_with_re(regex, text):
+    expected = bool(re.search(regex, text, re.IGNORECASE))
+    assert bool(compile_search(regex)(text)) is expected